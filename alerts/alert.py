@@ -3,7 +3,7 @@ import random
 import sys
 import threading
 import time
-from queue import Queue
+import itertools
 from abc import ABC, abstractmethod
 import pygame
 from enum import Enum, auto
@@ -23,13 +23,19 @@ class AlertStrategy(ABC):
     def get_category(self):
         pass
 
+    def sequence(self):
+        """Clip names to play in order; a number is a pause in seconds."""
+        return []
+
 class StandardAlert(AlertStrategy):
     def __init__(self, alert_type):
         self.alert_type = alert_type
 
+    def sequence(self):
+        return [self.alert_type, "please_empty"]
+
     def play(self, alert_system):
-        alert_system._play_sound(alert_system.alerts[self.alert_type])
-        alert_system._play_sound(alert_system.alerts["please_empty"])
+        alert_system._play_sequence(self.sequence(), self.get_category())
 
     def get_category(self):
         return AlertCategory.OTHER
@@ -38,15 +44,75 @@ class RemoveAlert(AlertStrategy):
     def __init__(self, alert_type):
         self.alert_type = alert_type
 
+    def sequence(self):
+        return [self.alert_type, "remove", 2.0, "remove"]
+
     def play(self, alert_system):
-        alert_system._play_sound(alert_system.alerts[self.alert_type])
-        alert_system._play_sound(alert_system.alerts["remove"])
-        time.sleep(2)
-        alert_system._play_sound(alert_system.alerts["remove"])
+        alert_system._play_sequence(self.sequence(), self.get_category())
 
     def get_category(self):
         return AlertCategory.REMOVE
 
+class AlertQueue:
+    """Pending alerts keyed by ``(category, alert_type)``, REMOVE before OTHER.
+
+    A second alert for a key that is already pending is merged into it. A
+    REMOVE alert for a bin replaces that bin's pending OTHER alert, and an
+    OTHER alert is dropped while a REMOVE for the same bin is pending.
+    Within a category alerts come out in the order they were first queued.
+    There are at most two entries per bin, however often callers alert.
+    """
+
+    PRIORITY = {AlertCategory.REMOVE: 0, AlertCategory.OTHER: 1}
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.entries = {}
+        self.order = itertools.count()
+        self.queued = 0
+        self.merged = 0
+        self.superseded = 0
+
+    def put(self, alert_strategy):
+        """Queue an alert; returns False if it was merged or superseded."""
+        category = alert_strategy.get_category()
+        alert_type = alert_strategy.alert_type
+        key = (category, alert_type)
+        with self.condition:
+            if key in self.entries:
+                self.merged += 1
+                return False
+            if category == AlertCategory.REMOVE:
+                if self.entries.pop((AlertCategory.OTHER, alert_type), None) is not None:
+                    self.superseded += 1
+            elif (AlertCategory.REMOVE, alert_type) in self.entries:
+                self.superseded += 1
+                return False
+            self.entries[key] = (self.PRIORITY[category], next(self.order), alert_strategy)
+            self.queued += 1
+            self.condition.notify()
+            return True
+
+    def get(self):
+        with self.condition:
+            while not self.entries:
+                self.condition.wait()
+            key = min(self.entries, key=self.entries.get)
+            return self.entries.pop(key)[2]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        with self.condition:
+            return {
+                "depth": len(self.entries),
+                "queued": self.queued,
+                "merged": self.merged,
+                "superseded": self.superseded,
+            }
+
+
 class Alert:
     def __init__(self):
         self.alerts = {
@@ -66,8 +132,12 @@ class Alert:
             AlertCategory.OTHER: 300    
         }
         self.lock = threading.Lock()
-        self.queue = Queue()
+        self.queue = AlertQueue()
+        self.played = 0
+        self.cooldown_drops = 0
         self.currently_playing = threading.Event()
+        self.sounds = {}
+        self.channels = {}
         self._initialize_pygame_mixer()
         threading.Thread(target=self._process_queue, daemon=True).start()
 
@@ -76,6 +146,7 @@ class Alert:
             try:
                 pygame.mixer.init()
                 print(f"Pygame mixer initialized successfully on attempt {attempt + 1}.")
+                self._load_sounds()
                 return
             except pygame.error as e:
                 print(f"Attempt {attempt + 1} to initialize pygame.mixer failed: {e}")
@@ -88,27 +159,55 @@ class Alert:
                     print(f"Pygame version: {pygame.version.ver}")
                     print(f"SDL version: {pygame.version.SDL}")
 
-    def _play_sound(self, sound_file):
+    def _load_sounds(self):
+        """Decode every clip once and reserve one mixer channel per alert category."""
+        for name, sound_file in self.alerts.items():
+            try:
+                self.sounds[name] = pygame.mixer.Sound(sound_file)
+            except pygame.error as e:
+                print(f"Failed to load sound {sound_file}: {e}")
+        pygame.mixer.set_reserved(len(AlertCategory))
+        self.channels = {
+            category: pygame.mixer.Channel(index) for index, category in enumerate(AlertCategory)
+        }
+
+    def _play_sequence(self, sequence, category):
+        """Play clips back to back on the category's channel.
+
+        The worker sleeps for each clip's known length rather than polling
+        the mixer; pygame end-events would need the display and event
+        subsystems, which the headless server does not start.
+        """
         if not pygame.mixer.get_init():
             print("Pygame mixer is not initialized. Attempting to initialize...")
             self._initialize_pygame_mixer()
+        if not pygame.mixer.get_init():
+            print(f"Cannot play {sequence}: Pygame mixer is not initialized.")
+            return
 
-        if pygame.mixer.get_init():
+        channel = self.channels[category]
+        for step in sequence:
+            if isinstance(step, (int, float)):
+                time.sleep(step)
+                continue
+            sound = self.sounds.get(step)
+            if sound is None:
+                print(f"Sound '{step}' is not loaded.")
+                continue
             try:
-                pygame.mixer.music.load(sound_file)
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
+                channel.play(sound)
             except pygame.error as e:
-                print(f"Failed to play sound {sound_file}: {e}")
-        else:
-            print(f"Cannot play sound {sound_file}: Pygame mixer is not initialized.")
+                print(f"Failed to play sound {step}: {e}")
+                continue
+            time.sleep(sound.get_length())
+            # Allow for mixer buffering at the end of the clip.
+            while channel.get_busy():
+                time.sleep(0.02)
 
     def _process_queue(self):
         while True:
             alert_strategy = self.queue.get()
             self._play_alert(alert_strategy)
-            self.queue.task_done()
 
     def _play_alert(self, alert_strategy):
         with self.lock:
@@ -121,21 +220,41 @@ class Alert:
 
             time_since_last_play = current_time - self.last_play_time[category]
             if time_since_last_play < self.cooldown_time[category]:
+                self.cooldown_drops += 1
                 print(f"Cooldown active for {category.name}. Skipping {alert_strategy.alert_type}.")
                 return
 
-            print(f"Playing alert sound: {alert_strategy.alert_type} (Category: {category.name})")
+            self.played += 1
             self.currently_playing.set()
+            self.last_play_time[category] = current_time
+
+        # Playback runs outside the lock so callers checking state never wait on audio.
+        print(f"Playing alert sound: {alert_strategy.alert_type} (Category: {category.name})")
+        try:
             alert_strategy.play(self)
+        finally:
             self.currently_playing.clear()
 
-            self.last_play_time[category] = current_time
+    def _in_cooldown(self, category):
+        return time.time() - self.last_play_time[category] < self.cooldown_time[category]
 
     def _queue_alert(self, alert_strategy):
-        if alert_strategy.alert_type in self.alerts:
-            self.queue.put(alert_strategy)
-        else:
+        if alert_strategy.alert_type not in self.alerts:
             print(f"Alert type '{alert_strategy.alert_type}' not recognized.")
+            return
+        # Dropping here keeps repeated calls during a cooldown from ever reaching the queue.
+        if self._in_cooldown(alert_strategy.get_category()):
+            self.cooldown_drops += 1
+            return
+        self.queue.put(alert_strategy)
+
+    def stats(self):
+        return dict(
+            self.queue.stats(),
+            played=self.played,
+            cooldown_drops=self.cooldown_drops,
+            playing=self.currently_playing.is_set(),
+        )
 
     def play_alert(self, alert_type):
         self._queue_alert(StandardAlert(alert_type))
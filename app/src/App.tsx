@@ -50,12 +50,14 @@ function App() {
   }, [binStatus]);
 
   useEffect(() => {
-    const handleSensorUpdate = (data: SensorData) => {
-      setSensorData({
-        SENSOR_1: getPercentage(data.SENSOR_1),
-        SENSOR_2: getPercentage(data.SENSOR_2),
-        SENSOR_3: getPercentage(data.SENSOR_3),
-        SENSOR_4: getPercentage(data.SENSOR_4),
+    // Updates only carry the sensors that changed, so merge into the last state.
+    const handleSensorUpdate = (data: Partial<SensorData>) => {
+      setSensorData((previous) => {
+        const next = { ...(previous ?? { SENSOR_1: 0, SENSOR_2: 0, SENSOR_3: 0, SENSOR_4: 0 }) };
+        (Object.keys(data) as (keyof SensorData)[]).forEach((key) => {
+          next[key] = getPercentage(data[key] as number);
+        });
+        return next;
       });
     };
 
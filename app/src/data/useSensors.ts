@@ -1,19 +1,36 @@
 import { SensorData } from "@/types/sensor.types";
-import { useQuery } from "@tanstack/react-query";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
 import axios from "axios";
+import { useEffect, useState } from "react";
 
 const localIpAddress = import.meta.env.VITE_LOCAL_IP_ADDRESS || 'localhost';
+const baseUrl = `http://${localIpAddress}:5000`;
 
 export function useSensors() {
+  const queryClient = useQueryClient();
+  const [streaming, setStreaming] = useState(false);
+
+  // Prefer the server-pushed stream; fall back to polling while it is down.
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return;
+    const source = new EventSource(`${baseUrl}/sensor_data/stream`);
+    source.addEventListener("sensor_update", (event) => {
+      queryClient.setQueryData(["sensor_data"], JSON.parse((event as MessageEvent).data));
+    });
+    source.onopen = () => setStreaming(true);
+    source.onerror = () => setStreaming(false);
+    return () => source.close();
+  }, [queryClient]);
+
   return useQuery<SensorData>({
     queryKey: ["sensor_data"],
     queryFn: async () => {
-      const url = `http://${localIpAddress}:5000/sensor_data`;
+      const url = `${baseUrl}/sensor_data`;
       const { data } = await axios.get(url);
       return data;
     },
     staleTime: 1000 * 60 * 5,
     gcTime: 1000 * 60 * 30,
-    refetchInterval: 2500,
+    refetchInterval: streaming ? false : 2500,
   });
 }
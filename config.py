@@ -9,6 +9,35 @@ FLASK_PORT = int(os.getenv("FLASK_PORT", 5000))
 SERIAL_PORT = os.getenv("SERIAL_PORT", "/dev/ttyUSB0")
 SERIAL_BAUD_RATE = int(os.getenv("SERIAL_BAUD_RATE", 9600))
 SENSOR_SERIAL_PORT = os.getenv("SENSOR_SERIAL_PORT", "/dev/ttyACM0")
+SENSOR_BAUD_RATE = int(os.getenv("SENSOR_BAUD_RATE", 19200))
+SENSOR_PROTOCOL = os.getenv("SENSOR_PROTOCOL", "legacy")
 NOTIFICATION_INTERVAL = int(os.getenv("NOTIFICATION_INTERVAL", 10))
 SENSOR_UPDATE_INTERVAL = int(os.getenv("SENSOR_UPDATE_INTERVAL", 2))
 SENSOR_THRESHOLD = int(os.getenv("SENSOR_THRESHOLD", 13))
+SENSOR_MEDIAN_WINDOW = int(os.getenv("SENSOR_MEDIAN_WINDOW", 5))
+SENSOR_PROCESS_VARIANCE = float(os.getenv("SENSOR_PROCESS_VARIANCE", 4.0))
+SENSOR_MEASUREMENT_VARIANCE = float(os.getenv("SENSOR_MEASUREMENT_VARIANCE", 4.0))
+BROADCAST_EPSILON = float(os.getenv("BROADCAST_EPSILON", 0.5))
+BROADCAST_INTERVAL = float(os.getenv("BROADCAST_INTERVAL", 0.5))
+HAL_BACKEND = os.getenv("HAL_BACKEND", "real")
+GPIO_DRIVER = os.getenv("GPIO_DRIVER", "rpi")
+SIM_SPEED = float(os.getenv("SIM_SPEED", 1.0))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 200))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 2.0))
+LOG_SPOOL_PATH = os.getenv("LOG_SPOOL_PATH", "log_spool.db")
+LOG_SPOOL_MAX_MB = int(os.getenv("LOG_SPOOL_MAX_MB", 256))
+LOG_SPOOL_DROP_POLICY = os.getenv("LOG_SPOOL_DROP_POLICY", "oldest")
+LOG_PREDICTION_RATE = float(os.getenv("LOG_PREDICTION_RATE", 1.0))
+LOG_BIN_LEVEL_EPSILON = float(os.getenv("LOG_BIN_LEVEL_EPSILON", 1.0))
+LOG_BIN_LEVEL_HEARTBEAT = float(os.getenv("LOG_BIN_LEVEL_HEARTBEAT", 300))
+DATASET_JPEG_QUALITY = int(os.getenv("DATASET_JPEG_QUALITY", 90))
+DATASET_UPLOAD_WORKERS = int(os.getenv("DATASET_UPLOAD_WORKERS", 2))
+DATASET_UPLOAD_QUEUE = int(os.getenv("DATASET_UPLOAD_QUEUE", 8))
+DATASET_HASH_DISTANCE = int(os.getenv("DATASET_HASH_DISTANCE", 10))
+DATASET_HASH_INDEX_SIZE = int(os.getenv("DATASET_HASH_INDEX_SIZE", 512))
+DATASET_PREFER_UNCERTAIN = os.getenv("DATASET_PREFER_UNCERTAIN", "False").lower() in ("true", "1", "t")
+SMS_PROTOCOL = os.getenv("SMS_PROTOCOL", "char")
+SMS_PHONE_NUMBER = os.getenv("SMS_PHONE_NUMBER", "")
+SMS_BATCH_WINDOW = float(os.getenv("SMS_BATCH_WINDOW", 2.0))
+VIDEO_QUALITY = int(os.getenv("VIDEO_QUALITY", 80))
+VIDEO_MAX_FPS = float(os.getenv("VIDEO_MAX_FPS", 15))
\ No newline at end of file
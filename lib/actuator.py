@@ -0,0 +1,142 @@
+import logging
+import queue
+import threading
+import time
+from lib.hal import Clock
+
+DISPOSE_ACTIONS = {
+    "Bio-degradable": ("dispose_biodegradable", "Biodegradable"),
+    "Non-biodegradable": ("dispose_non_biodegradable", "Non-Biodegradable"),
+    "Recyclable": ("dispose_recyclable", "Recyclable"),
+    "Hazardous": ("dispose_hazardous", "Hazardous"),
+}
+
+
+class ActuationWorker:
+    """Runs disposals on a dedicated thread so callers never wait on the servos.
+
+    Commands go into a bounded queue; ``submit`` returns immediately and
+    reports whether the command was accepted. The worker moves one item at a
+    time and waits out ``cooldown`` seconds after each completed disposal
+    before starting the next, so the interlock holds no matter how often
+    callers submit. ``on_complete(event)`` is called on the worker thread
+    after every command.
+
+    ``chute_clear`` turns true as soon as every submitted item has actually
+    dropped (``on_dropped(event)`` fires at that point), which is before the
+    chute has returned to rest. Callers use it to confirm and queue the next
+    item while the current disposal is still finishing.
+    """
+
+    def __init__(self, dispose, on_complete=None, on_dropped=None, max_pending=2, cooldown=0.5, clock=None):
+        self.dispose = dispose
+        self.clock = clock or getattr(dispose, "clock", None) or Clock()
+        self.on_complete = on_complete
+        self.on_dropped = on_dropped
+        self.cooldown = cooldown
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.lock = threading.Lock()
+        self.outstanding = 0
+        self.awaiting_drop = 0
+        self.busy = False
+        self.current = None
+        self.last_completion_time = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def submit(self, detection):
+        if detection not in DISPOSE_ACTIONS:
+            raise ValueError(f"No disposal action for {detection}")
+        status = DISPOSE_ACTIONS[detection][1]
+        with self.lock:
+            try:
+                self.queue.put_nowait((detection, status, time.time()))
+            except queue.Full:
+                self.rejected += 1
+                logging.warning(f"Actuation queue full, rejecting {detection}")
+                return False
+            self.outstanding += 1
+            self.awaiting_drop += 1
+            return True
+
+    @property
+    def idle(self):
+        return self.outstanding == 0
+
+    @property
+    def chute_clear(self):
+        return self.awaiting_drop == 0
+
+    def _worker(self):
+        while True:
+            detection, status, submitted_at = self.queue.get()
+            self.busy = True
+            try:
+                remaining = self.last_completion_time + self.cooldown - self.clock.monotonic()
+                self.clock.sleep(remaining)
+                self._execute(detection, status, submitted_at)
+            finally:
+                self.busy = False
+                self.current = None
+                with self.lock:
+                    self.outstanding -= 1
+                self.queue.task_done()
+
+    def _item_dropped(self, detection, dropped):
+        if dropped[0]:
+            return
+        dropped[0] = True
+        with self.lock:
+            self.awaiting_drop -= 1
+        if self.on_dropped is not None:
+            try:
+                self.on_dropped({"detection": detection, "dropped_at": time.time()})
+            except Exception as e:
+                logging.error(f"Actuation drop callback failed: {e}")
+
+    def _execute(self, detection, status, submitted_at):
+        method_name = DISPOSE_ACTIONS[detection][0]
+        self.current = detection
+        started_at = time.time()
+        error = None
+        dropped = [False]
+        try:
+            getattr(self.dispose, method_name)(on_dropped=lambda: self._item_dropped(detection, dropped))
+            self.completed += 1
+        except Exception as e:
+            error = str(e)
+            self.failed += 1
+            logging.error(f"Disposal of {detection} failed: {e}", exc_info=True)
+        finally:
+            self.last_completion_time = self.clock.monotonic()
+            # A failed move still releases the interlock rather than wedging the pipeline.
+            self._item_dropped(detection, dropped)
+
+        event = {
+            "detection": detection,
+            "status": status,
+            "ok": error is None,
+            "error": error,
+            "submitted_at": submitted_at,
+            "started_at": started_at,
+            "completed_at": time.time(),
+        }
+        if self.on_complete is not None:
+            try:
+                self.on_complete(event)
+            except Exception as e:
+                logging.error(f"Actuation completion callback failed: {e}")
+
+    def status(self):
+        return {
+            "busy": self.busy,
+            "current": self.current,
+            "pending": self.queue.qsize(),
+            "chute_clear": self.chute_clear,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
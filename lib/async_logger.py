@@ -1,40 +1,264 @@
-from fileinput import filename
+import hashlib
 import logging
-import os
-import tempfile
-import threading
 import queue
+import threading
 import time
+from collections import deque
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
+from lib.log_policy import PRIORITY_HIGH, TablePolicy, default_policies
+from lib.spool import LogSpool
 import cv2
 
+# PostgREST request/schema errors and PostgreSQL data (22xxx) and integrity
+# (23xxx) violations: resending the same rows can never succeed.
+PERMANENT_ERROR_CODES = ("PGRST1", "PGRST2", "22", "23")
+
+
+def is_permanent_error(error):
+    """True if the backend refused the rows themselves rather than being unavailable."""
+    code = str(getattr(error, "code", None) or "")
+    return code.startswith(PERMANENT_ERROR_CODES)
+
+
 class AsyncLogger:
-    def __init__(self, url: str, key: str):
+    """Spools log rows to disk and uploads them to Supabase in the background.
+
+    Every table has a ``TablePolicy`` (see ``lib.log_policy``) that may
+    sample or skip rows, and its own bounded in-memory queue. ``log`` never
+    blocks: when a table's queue is full the row is dropped and counted. A
+    writer thread moves queued rows, highest priority first, into a
+    ``LogSpool`` in one transaction per burst, so rows survive network
+    outages and restarts while memory stays flat.
+
+    A drainer thread uploads spooled rows per table as multi-row inserts once
+    a table has ``batch_size`` rows waiting or its oldest row has waited the
+    table's flush interval, oldest first, so each table keeps its order.
+    Tables are drained in priority order and a newly spooled high-priority
+    row interrupts a long low-priority backlog between batches. Rows leave
+    the spool only after the insert succeeds. Connection failures back off
+    exponentially from ``retry_delay`` up to ``max_backoff`` seconds and
+    retry indefinitely, as do server, auth and rate-limit errors from the
+    API. Only a batch the backend rejects as invalid (see
+    ``is_permanent_error``) is retried ``max_retries`` times and then
+    dropped so it cannot wedge its table.
+
+    Dataset frames are JPEG-encoded in memory and uploaded by a pool of
+    ``upload_workers`` threads fed from a queue of ``upload_queue`` frames.
+    """
+
+    def __init__(self, url: str, key: str, batch_size=200, flush_interval=2.0, max_retries=3,
+                 retry_delay=1.0, max_backoff=300.0, spool_path="log_spool.db",
+                 spool_max_bytes=256 * 1024 * 1024, drop_policy="oldest", policies=None,
+                 bucket_name="dataset/images", jpeg_quality=90, upload_workers=2, upload_queue=8):
         self.supabase: Client = create_client(url, key)
-        self.queue = queue.Queue()
-        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_backoff = max_backoff
+        self.spool = LogSpool(spool_path, max_bytes=spool_max_bytes, drop_policy=drop_policy)
+        self.policies = default_policies() if policies is None else dict(policies)
+        self.lock = threading.Lock()
+        self.queues = {}
+        self.dropped = {}
+        self.pending = threading.Event()
+        self.wakeup = threading.Event()
+        self.urgent = threading.Event()
+        self.backoff = 0.0
+        self.rejections = {}
+        self.last_error = None
+        self.batches_sent = 0
+        self.rows_sent = 0
+        self.rows_rejected = 0
+        self.bucket_name = bucket_name
+        self.jpeg_quality = jpeg_quality
+        # One bucket handle shared by the workers so uploads reuse the client's connections.
+        self.dataset_bucket = self.supabase.storage.from_(bucket_name)
+        self.dataset_queue = queue.Queue(maxsize=upload_queue)
+        self.dataset_uploaded = 0
+        self.dataset_dropped = 0
+        self.dataset_failed = 0
+        for _ in range(upload_workers):
+            threading.Thread(target=self._dataset_worker, daemon=True).start()
+        self.writer_thread = threading.Thread(target=self._writer, daemon=True)
+        self.writer_thread.start()
+        self.thread = threading.Thread(target=self._drainer, daemon=True)
         self.thread.start()
         logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    def _worker(self):
+    def _policy(self, table_name):
+        policy = self.policies.get(table_name)
+        if policy is None:
+            with self.lock:
+                policy = self.policies.setdefault(table_name, TablePolicy())
+        return policy
+
+    def _enqueue(self, table_name, rows, policy):
+        now = time.time()
+        with self.lock:
+            table_queue = self.queues.get(table_name)
+            if table_queue is None:
+                table_queue = self.queues[table_name] = deque()
+                self.dropped[table_name] = 0
+            for log_type, data in rows:
+                if len(table_queue) >= policy.max_queue:
+                    self.dropped[table_name] += 1
+                    continue
+                table_queue.append((table_name, log_type, data, now, policy.priority))
+        self.pending.set()
+
+    def _take(self):
+        with self.lock:
+            rows = []
+            for table_name in sorted(self.queues, key=lambda name: self.policies[name].priority):
+                table_queue = self.queues[table_name]
+                while table_queue:
+                    rows.append(table_queue.popleft())
+            return rows
+
+    def _writer(self):
         while True:
+            # The timeout closes sampling windows even when no new rows arrive.
+            self.pending.wait(timeout=0.5)
+            self.pending.clear()
+            now = time.monotonic()
+            for table_name, policy in list(self.policies.items()):
+                ready = policy.collect(now)
+                if ready:
+                    self._enqueue(table_name, ready, policy)
+            rows = self._take()
+            if not rows:
+                continue
             try:
-                table_name, data, log_type = self.queue.get()
-                self._log(table_name, data, log_type)
+                self.spool.append(rows)
             except Exception as e:
-                logging.error(f"AsyncLogger worker error: {e}")
-            finally:
-                self.queue.task_done()
+                with self.lock:
+                    for row in rows:
+                        self.dropped[row[0]] = self.dropped.get(row[0], 0) + 1
+                logging.error(f"Failed to spool {len(rows)} log rows: {e}")
+                continue
+            if rows[0][4] == PRIORITY_HIGH:
+                self.urgent.set()
+            self.wakeup.set()
 
-    def _log(self, table_name: str, data: dict, log_type: str):
+    def _drainer(self):
+        while True:
+            if self.backoff:
+                time.sleep(self.backoff)
+            else:
+                self.wakeup.wait(timeout=self._next_deadline())
+            self.wakeup.clear()
+            try:
+                while self._drain():
+                    pass
+            except Exception as e:
+                logging.error(f"AsyncLogger drainer error: {e}")
+
+    def _table_flush_interval(self, table_name):
+        interval = self._policy(table_name).flush_interval
+        return self.flush_interval if interval is None else interval
+
+    def _next_deadline(self):
+        tables = self.spool.tables()
+        if not tables:
+            return None
+        due = min(oldest + self._table_flush_interval(name) for name, (_, oldest) in tables.items())
+        return max(0.0, due - time.time())
+
+    def _drain(self):
+        """Upload due tables in priority order; returns True to start over for urgent rows."""
+        self.urgent.clear()
+        now = time.time()
+        tables = self.spool.tables()
+        order = sorted(tables.items(), key=lambda item: (self._policy(item[0]).priority, item[1][1]))
+        for table_name, (count, oldest) in order:
+            if count < self.batch_size and now - oldest < self._table_flush_interval(table_name):
+                continue
+            while True:
+                last_id, log_type, data = self.spool.peek(table_name, self.batch_size)
+                if not data:
+                    break
+                if not self._send(table_name, last_id, log_type, data):
+                    if self.backoff:
+                        return False
+                    continue
+                if len(data) < self.batch_size:
+                    break
+                if self.urgent.is_set():
+                    return True
+        return False
+
+    def _send(self, table_name: str, last_id: int, log_type: str, data: list):
         try:
-            self.supabase.table(table_name).insert([data]).execute()
-            logging.debug(f"{log_type.capitalize()} logged: {data}")
+            self.supabase.table(table_name).insert(data).execute()
+        except APIError as e:
+            if not is_permanent_error(e):
+                return self._back_off(table_name, data, e)
+            # The backend refused the rows themselves; retrying forever would block the table.
+            self.last_error = str(e)
+            attempts = self.rejections.get(table_name, 0) + 1
+            self.rejections[table_name] = attempts
+            if attempts > self.max_retries:
+                self.rejections.pop(table_name, None)
+                self.spool.remove(table_name, last_id)
+                self.rows_rejected += len(data)
+                logging.error(f"Dropping {len(data)} {log_type} rows rejected by {table_name}: {e}")
+            else:
+                logging.warning(f"Insert into {table_name} rejected ({e}), attempt {attempts}")
+            return False
         except Exception as e:
-            logging.error(f"Failed to log {log_type}: {data} - Error: {e}")
+            return self._back_off(table_name, data, e)
+        self.spool.remove(table_name, last_id)
+        self.rejections.pop(table_name, None)
+        self.backoff = 0.0
+        self.batches_sent += 1
+        self.rows_sent += len(data)
+        logging.debug(f"{log_type.capitalize()} logged: {len(data)} rows to {table_name}")
+        return True
+
+    def _back_off(self, table_name, data, error):
+        self.last_error = str(error)
+        self.backoff = min(self.max_backoff, max(self.retry_delay, self.backoff * 2))
+        logging.warning(
+            f"Insert into {table_name} failed ({error}), {len(data)} rows kept in spool; "
+            f"retrying in {self.backoff:.0f}s"
+        )
+        return False
 
     def log(self, table_name: str, data: dict, log_type: str):
-        self.queue.put((table_name, data, log_type))
+        policy = self._policy(table_name)
+        rows = policy.admit(data, time.monotonic(), log_type)
+        if rows:
+            self._enqueue(table_name, rows, policy)
+
+    def stats(self):
+        spooled = self.spool.tables()
+        with self.lock:
+            tables = {
+                table_name: dict(
+                    policy.stats(),
+                    queued=len(self.queues.get(table_name, ())),
+                    dropped=self.dropped.get(table_name, 0),
+                    spooled=spooled.get(table_name, (0, None))[0],
+                )
+                for table_name, policy in self.policies.items()
+            }
+        return {
+            "tables": tables,
+            "spool": self.spool.stats(),
+            "backoff": self.backoff,
+            "last_error": self.last_error,
+            "batches_sent": self.batches_sent,
+            "rows_sent": self.rows_sent,
+            "rows_rejected": self.rows_rejected,
+            "dataset": {
+                "queued": self.dataset_queue.qsize(),
+                "uploaded": self.dataset_uploaded,
+                "dropped": self.dataset_dropped,
+                "failed": self.dataset_failed,
+            },
+        }
 
     def log_prediction(self, prediction: dict):
         self.log("prediction_log", prediction, "prediction")
@@ -48,19 +272,39 @@ class AsyncLogger:
     def log_alert(self, alert: dict):
         self.log("alert_log", alert, "alert")
 
-    def log_dataset(self, frame_data: tuple):
-        logging.info("Logging dataset debug message.")
+    def log_dataset(self, frame):
+        """Queue a frame (a VideoFrame or a BGR image) for upload to the dataset bucket.
+
+        Never blocks: if every upload worker is busy and the queue is full,
+        the frame is dropped and counted.
+        """
+        image = getattr(frame, "image", frame)
         try:
-            with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-                filename = f"{int(time.time())}.jpg"
-                tmp_file_path = tmp_file.name
-                cv2.imwrite(tmp_file_path, frame_data[1])
-                with open(tmp_file_path, 'rb') as file_data:
-                    bucket_name = "dataset/images"
-                    self.supabase.storage.from_(bucket_name).upload(filename, file_data)
-                    logging.info(f"Successfully uploaded {filename} to {bucket_name}.")
-        except Exception as e:
-            logging.error(f"Failed to log dataset: {e}")
-        finally:
-            os.remove(tmp_file_path)
-            logging.info(f"Temporary file {tmp_file_path} deleted.")
\ No newline at end of file
+            self.dataset_queue.put_nowait(image)
+        except queue.Full:
+            self.dataset_dropped += 1
+            logging.debug("Dataset upload queue full, frame dropped")
+
+    def _dataset_worker(self):
+        while True:
+            image = self.dataset_queue.get()
+            try:
+                self._upload_image(image)
+            except Exception as e:
+                self.dataset_failed += 1
+                logging.error(f"Failed to log dataset: {e}")
+            finally:
+                self.dataset_queue.task_done()
+
+    def _upload_image(self, image):
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        data = encoded.tobytes()
+        # Content-addressed: identical frames share a name and concurrent uploads never collide.
+        filename = f"{hashlib.sha256(data).hexdigest()[:32]}.jpg"
+        self.dataset_bucket.upload(
+            filename, data, {"content-type": "image/jpeg", "upsert": "true"}
+        )
+        self.dataset_uploaded += 1
+        logging.info(f"Successfully uploaded {filename} to {self.bucket_name}.")
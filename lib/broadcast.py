@@ -0,0 +1,175 @@
+import json
+import logging
+import struct
+import threading
+import time
+
+SENSOR_KEYS = ("SENSOR_1", "SENSOR_2", "SENSOR_3", "SENSOR_4")
+
+
+def encode_binary(readings):
+    """Pack readings as a sensor bitmask byte followed by one float32 per set bit."""
+    mask = 0
+    values = []
+    for i, key in enumerate(SENSOR_KEYS):
+        if key in readings:
+            mask |= 1 << i
+            values.append(readings[key])
+    return struct.pack(f"<B{len(values)}f", mask, *values)
+
+
+class SensorBroadcaster:
+    """Change-only, rate-limited ``sensor_update`` fan-out over Socket.IO.
+
+    ``publish`` never emits directly; it hands the newest readings to a
+    worker that sends at most one frame per ``interval`` seconds, containing
+    only the sensors that moved by at least ``epsilon`` since they were last
+    sent. Clients are grouped into rooms by the bins they subscribed to and
+    by payload format, so each room gets a single emit per frame.
+    """
+
+    def __init__(self, socketio, epsilon=0.5, interval=0.5, namespace="/"):
+        self.socketio = socketio
+        self.epsilon = epsilon
+        self.interval = interval
+        self.namespace = namespace
+        self.sent = {}
+        self.pending = None
+        self.last_emit = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.clients = {}
+        self.rooms = {}
+        self.lock = threading.Lock()
+        self._wake = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def _room_name(bins, binary):
+        return f"sensors:{','.join(bins)}{':binary' if binary else ''}"
+
+    def subscribe(self, sid, bins=None, binary=False):
+        bins = tuple(key for key in SENSOR_KEYS if bins is None or key in bins)
+        if not bins:
+            raise ValueError("No valid bins in subscription")
+        room = self._room_name(bins, binary)
+        with self.lock:
+            self._leave(sid)
+            self.socketio.server.enter_room(sid, room, namespace=self.namespace)
+            self.clients[sid] = room
+            _, _, count = self.rooms.get(room, (bins, binary, 0))
+            self.rooms[room] = (bins, binary, count + 1)
+        return bins
+
+    def unsubscribe(self, sid):
+        with self.lock:
+            self._leave(sid)
+
+    def _leave(self, sid):
+        room = self.clients.pop(sid, None)
+        if room is None:
+            return
+        self.socketio.server.leave_room(sid, room, namespace=self.namespace)
+        bins, binary, count = self.rooms[room]
+        if count <= 1:
+            del self.rooms[room]
+        else:
+            self.rooms[room] = (bins, binary, count - 1)
+
+    def snapshot(self, readings, bins=None, binary=False):
+        selected = {key: value for key, value in readings.items() if bins is None or key in bins}
+        return encode_binary(selected) if binary else selected
+
+    def publish(self, readings):
+        self.pending = readings
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            delay = self.last_emit + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._wake.clear()
+            try:
+                self._flush()
+            except Exception as e:
+                logging.error(f"Sensor broadcast error: {e}")
+
+    def _flush(self):
+        readings = self.pending
+        if readings is None:
+            return
+        delta = {
+            key: value
+            for key, value in readings.items()
+            if key not in self.sent or abs(value - self.sent[key]) >= self.epsilon
+        }
+        if not delta:
+            self.frames_skipped += 1
+            return
+        self.sent.update(delta)
+        self.last_emit = time.monotonic()
+        with self.lock:
+            rooms = list(self.rooms.items())
+        for room, (bins, binary, _) in rooms:
+            payload = {key: value for key, value in delta.items() if key in bins}
+            if not payload:
+                continue
+            if binary:
+                self.socketio.emit("sensor_update_binary", encode_binary(payload), to=room,
+                                   namespace=self.namespace)
+            else:
+                self.socketio.emit("sensor_update", payload, to=room, namespace=self.namespace)
+        self.frames_sent += 1
+
+    def stats(self):
+        with self.lock:
+            clients = len(self.clients)
+            rooms = len(self.rooms)
+        return {
+            "clients": clients,
+            "rooms": rooms,
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+        }
+
+
+class SensorSnapshot:
+    """Pre-serialized, version-stamped copy of the latest readings.
+
+    The JSON body and its ETag are built once per change instead of once per
+    request, and only when some sensor moved by at least ``epsilon``. The
+    state is swapped as one tuple so request handlers read it without a lock.
+    ``wait_for_change`` lets streaming handlers block until the next version.
+    """
+
+    def __init__(self, readings, epsilon=0.5):
+        self.epsilon = epsilon
+        self.boot_id = f"{int(time.time()):x}"
+        self.state = None
+        self._changed = threading.Condition()
+        self._set(0, readings)
+
+    def _set(self, version, readings):
+        readings = dict(readings)
+        body = json.dumps(readings).encode()
+        self.state = (version, f"{self.boot_id}-{version}", body, readings)
+        with self._changed:
+            self._changed.notify_all()
+
+    def update(self, readings):
+        version, _, _, current = self.state
+        if all(
+            key in current and abs(value - current[key]) < self.epsilon
+            for key, value in readings.items()
+        ):
+            return False
+        self._set(version + 1, readings)
+        return True
+
+    def wait_for_change(self, version, timeout=None):
+        with self._changed:
+            self._changed.wait_for(lambda: self.state[0] != version, timeout=timeout)
+        return self.state
@@ -0,0 +1,102 @@
+import math
+from collections import deque
+
+
+class SequentialConfirmation:
+    """Log-odds accumulator that confirms a class as soon as the evidence allows.
+
+    Each observation of class ``k`` with confidence ``p`` adds ``log(p / (1 - p))``
+    to ``k``'s score and treats the remaining probability as spread evenly over
+    the other ``num_classes - 1`` classes, which lowers their scores by the same
+    rule. A class is confirmed once its score crosses
+    ``log((1 - error_rate) / error_rate)`` (Wald's upper SPRT bound), so a few
+    confident frames decide quickly while flickering, low-confidence frames
+    keep cancelling each other out. Scores are floored at the matching lower
+    bound so an early misread does not take long to overturn. A single class
+    flip only shifts evidence; it never clears it.
+    """
+
+    def __init__(self, num_classes=4, error_rate=0.01, min_observations=3, max_gap=1.0,
+                 confidence_range=(0.05, 0.99)):
+        if not 0 < error_rate < 0.5:
+            raise ValueError("error_rate must be between 0 and 0.5")
+        self.num_classes = max(2, num_classes)
+        self.error_rate = error_rate
+        self.threshold = math.log((1 - error_rate) / error_rate)
+        self.min_observations = min_observations
+        self.max_gap = max_gap
+        self.confidence_range = confidence_range
+        self.reset()
+
+    def reset(self):
+        self.scores = {}
+        self.observations = 0
+        self.started_at = None
+        self.last_seen = None
+
+    def _log_odds(self, p):
+        low, high = self.confidence_range
+        p = min(max(p, low), high)
+        return math.log(p / (1 - p))
+
+    def update(self, detection, confidence, now):
+        """Add one observation; returns the confirmed class or None."""
+        if self.last_seen is not None and now - self.last_seen > self.max_gap:
+            self.reset()
+        if self.started_at is None:
+            self.started_at = now
+        self.last_seen = now
+        self.observations += 1
+
+        p = 1.0 if confidence is None else float(confidence)
+        self.scores.setdefault(detection, 0.0)
+        other = self._log_odds((1 - p) / (self.num_classes - 1))
+        for name in self.scores:
+            evidence = self._log_odds(p) if name == detection else other
+            self.scores[name] = max(-self.threshold, self.scores[name] + evidence)
+        return self.decision
+
+    @property
+    def leader(self):
+        if not self.scores:
+            return None
+        return max(self.scores, key=self.scores.get)
+
+    @property
+    def decision(self):
+        leader = self.leader
+        if (
+            leader is not None
+            and self.observations >= self.min_observations
+            and self.scores[leader] >= self.threshold
+        ):
+            return leader
+        return None
+
+
+class DecisionStats:
+    """Rolling record of how long confirmations take, for tuning and dashboards."""
+
+    def __init__(self, maxlen=200):
+        self.latencies = deque(maxlen=maxlen)
+        self.decisions = 0
+
+    def record(self, latency):
+        self.latencies.append(latency)
+        self.decisions += 1
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {"decisions": self.decisions, "mean": None, "p50": None, "p95": None, "max": None}
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+        return {
+            "decisions": self.decisions,
+            "mean": sum(latencies) / len(latencies),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": latencies[-1],
+        }
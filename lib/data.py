@@ -1,28 +1,231 @@
+import logging
 import os
 import sys
+import threading
+import time
+from collections import deque
 import serial
 import serial.tools.list_ports
+from google.protobuf.message import DecodeError
 from proto import trashscan_protocol_pb2
+from proto.framing import FrameDecoder, MSG_BIN_STATUS, MSG_BIN_STATUS_BATCH, batch_columns
+from lib.hal import get_hal
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+SENSOR_KEYS = ("SENSOR_1", "SENSOR_2", "SENSOR_3", "SENSOR_4")
+
+
 class Data:
-    def __init__(self):
+    """Long-lived reader that owns the sensor serial port.
+
+    A background thread parses BIN_STATUS messages as they arrive and
+    publishes them to ``latest`` (a single reference swap, so readers never
+    take a lock) and to ``samples``, a bounded ring of recent readings.
+    Published timestamps never go backwards, including across batches read
+    after uneven delays.
+
+    ``protocol`` selects the wire format: ``"legacy"`` (the default) for the
+    old fixed 20-byte BIN_STATUS reads, or ``"framed"`` for COBS/CRC frames
+    (see ``proto.framing``) once the board firmware speaks them. The
+    simulated HAL emits whichever format ``SENSOR_PROTOCOL`` selects;
+    ``lib.fake_device`` only emits framed data.
+    """
+
+    def __init__(self, port='/dev/ttyACM0', baud_rate=19200, history_size=256,
+                 read_timeout=1, reconnect_delay=1, protocol="legacy", hal=None):
+        if protocol not in ("framed", "legacy"):
+            raise ValueError(f"Unknown sensor protocol: {protocol}")
+        self.hal = hal or get_hal()
+        self.port = port
+        self.baud_rate = baud_rate
+        self.protocol = protocol
+        self.decoder = FrameDecoder()
+        self._reset_clock()
+        self.read_timeout = read_timeout
+        self.reconnect_delay = reconnect_delay
         self.sensor_1 = 40
         self.sensor_2 = 40
         self.sensor_3 = 40
         self.sensor_4 = 40
-        
-    def retrieve_data(self):
-        ser = serial.Serial('/dev/ttyACM0', 19200)
-        encoded_message = ser.read(20)
+        self.latest = None
+        self.samples = deque(maxlen=history_size)
+        self.sequence = 0
+        self.connected = False
+        self.serial_connection = None
+        self.listeners = []
+        self._updated = threading.Condition()
+        self._stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.read_timeout + 1)
+        self._close()
+
+    def add_listener(self, callback):
+        """Register ``callback(samples)`` to receive every batch of new samples on the reader thread."""
+        self.listeners.append(callback)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self.serial_connection is None and not self._open():
+                self._stop_event.wait(self.reconnect_delay)
+                continue
+            try:
+                if self.protocol == "framed":
+                    self._read_frames()
+                else:
+                    bin_status = self._read_message()
+                    if bin_status is not None:
+                        self._publish(bin_status)
+            except serial.SerialException as e:
+                logging.warning(f"Sensor serial connection lost on {self.port}: {e}")
+                self._close()
+            except Exception as e:
+                logging.error(f"Sensor reader error: {e}")
+
+    def _open(self):
+        try:
+            self.serial_connection = self.hal.open_serial(self.port, self.baud_rate, timeout=self.read_timeout)
+            self.decoder = FrameDecoder()
+            self._reset_clock()
+            self.connected = True
+            logging.info(f"Sensor serial connection opened on {self.port}")
+            return True
+        except (serial.SerialException, OSError) as e:
+            logging.debug(f"Sensor serial port {self.port} unavailable: {e}")
+            self.serial_connection = None
+            self.connected = False
+            return False
+
+    def _close(self):
+        connection, self.serial_connection = self.serial_connection, None
+        self.connected = False
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception as e:
+                logging.debug(f"Error closing sensor serial connection: {e}")
+
+    def _read_message(self):
+        encoded_message = self.serial_connection.read(20)
+        if len(encoded_message) < 20:
+            return None
         bin_status = trashscan_protocol_pb2.BIN_STATUS()
-        bin_status.ParseFromString(encoded_message)
-        self.sensor_1 = bin_status.SENSOR_1
-        self.sensor_2 = bin_status.SENSOR_2
-        self.sensor_3 = bin_status.SENSOR_3
-        self.sensor_4 = bin_status.SENSOR_4
+        try:
+            bin_status.ParseFromString(encoded_message)
+        except DecodeError as e:
+            logging.debug(f"Discarding malformed BIN_STATUS message: {e}")
+            return None
+        return bin_status
+
+    def _read_frames(self):
+        connection = self.serial_connection
+        chunk = connection.read(connection.in_waiting or 1)
+        if chunk:
+            self._feed(chunk, time.time())
+
+    def _feed(self, chunk, now):
+        """Decode ``chunk`` (received at host time ``now``) and publish its samples."""
+        for msg_type, message in self.decoder.feed(chunk):
+            if msg_type == MSG_BIN_STATUS:
+                self._publish(message, now)
+            elif msg_type == MSG_BIN_STATUS_BATCH:
+                self._publish_batch(message, now)
+
+    def _reset_clock(self):
+        self.clock_offsets = deque(maxlen=32)
+        self.device_epoch = 0
+        self.last_device_ms = None
+
+    def _device_seconds(self, timestamp_ms):
+        """Unwrap the device's 32-bit millis() into seconds since it booted."""
+        if self.last_device_ms is not None and timestamp_ms < self.last_device_ms:
+            if self.last_device_ms - timestamp_ms > 0x80000000:
+                self.device_epoch += 0x100000000
+            else:
+                # The board restarted, so the old offsets no longer apply.
+                self.clock_offsets.clear()
+        self.last_device_ms = timestamp_ms
+        return (self.device_epoch + timestamp_ms) / 1000.0
+
+    def _publish_batch(self, batch, now=None):
+        timestamps_ms, columns = batch_columns(batch)
+        if not timestamps_ms:
+            return
+        # Device timestamps are millis() since boot. Read delays only ever add
+        # to (host - device) time, so the least-delayed of the recent batches
+        # gives the device-to-host offset; samples are then clamped so they
+        # never go backwards when that estimate improves.
+        now = time.time() if now is None else now
+        newest_ms = timestamps_ms[-1]
+        newest = self._device_seconds(newest_ms)
+        self.clock_offsets.append(now - newest)
+        offset = min(self.clock_offsets)
+        floor = self.latest[0] if self.latest is not None else float("-inf")
+        samples = []
+        for timestamp_ms, values in zip(timestamps_ms, zip(*columns)):
+            timestamp = max(floor, offset + newest - ((newest_ms - timestamp_ms) & 0xFFFFFFFF) / 1000.0)
+            floor = timestamp
+            samples.append((timestamp, dict(zip(SENSOR_KEYS, values))))
+        self.samples.extend(samples)
+        self._notify_listeners(samples)
+        self._set_latest(samples[-1])
+
+    def _publish(self, bin_status, timestamp=None):
+        readings = {key: getattr(bin_status, key) for key in SENSOR_KEYS}
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.latest is not None:
+            timestamp = max(timestamp, self.latest[0])
+        sample = (timestamp, readings)
+        self.samples.append(sample)
+        self._notify_listeners([sample])
+        self._set_latest(sample)
+
+    def _notify_listeners(self, samples):
+        for callback in self.listeners:
+            try:
+                callback(samples)
+            except Exception as e:
+                logging.error(f"Sensor listener error: {e}")
+
+    def _set_latest(self, sample):
+        readings = sample[1]
+        self.latest = sample
+        self.sensor_1 = readings["SENSOR_1"]
+        self.sensor_2 = readings["SENSOR_2"]
+        self.sensor_3 = readings["SENSOR_3"]
+        self.sensor_4 = readings["SENSOR_4"]
+        with self._updated:
+            self.sequence += 1
+            self._updated.notify_all()
+
+    def wait_for_sample(self, sequence, timeout=None):
+        """Block until a sample newer than ``sequence`` arrives.
+
+        Returns the current sequence number, which is unchanged on timeout.
+        """
+        with self._updated:
+            self._updated.wait_for(lambda: self.sequence != sequence, timeout=timeout)
+            return self.sequence
+
+    def stats(self):
+        return {"connected": self.connected, "updates": self.sequence, **self.decoder.stats()}
+
+    def recent(self, count=None):
+        samples = list(self.samples)
+        return samples if count is None else samples[-count:]
 
-    def check_transmission(self, serial_port='/dev/ttyACM0'):
+    def check_transmission(self, serial_port=None):
+        serial_port = serial_port or self.port
         ports = [port.device for port in serial.tools.list_ports.comports()]
-        return serial_port in ports
\ No newline at end of file
+        return serial_port in ports
@@ -0,0 +1,78 @@
+import logging
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+
+def dhash(image, hash_size=8):
+    """Difference hash: one bit per horizontally adjacent pair of a tiny greyscale copy."""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class DatasetCapture:
+    """Decides which confirmed frames are worth uploading as training data.
+
+    Each candidate frame is reduced to a ``hash_size``² bit dHash and
+    compared with an LRU index of the last ``index_size`` uploaded hashes.
+    Frames within ``max_distance`` bits of any of them are near-duplicates
+    and are skipped; a match also refreshes that entry, so an item sitting
+    in the chute keeps suppressing its own copies.
+
+    With ``prefer_uncertain`` set, frames whose confidence is below
+    ``uncertain_below`` only need to differ by more than
+    ``uncertain_distance`` bits, so the model's hard cases are sampled more
+    densely than the ones it already gets right.
+    """
+
+    def __init__(self, logger, hash_size=8, max_distance=10, index_size=512, prefer_uncertain=False,
+                 uncertain_below=0.8, uncertain_distance=4):
+        self.logger = logger
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.index_size = index_size
+        self.prefer_uncertain = prefer_uncertain
+        self.uncertain_below = uncertain_below
+        self.uncertain_distance = uncertain_distance
+        self.index = OrderedDict()
+        self.lock = threading.Lock()
+        self.offered = 0
+        self.captured = 0
+        self.duplicates = 0
+
+    def _threshold(self, confidence):
+        if self.prefer_uncertain and confidence is not None and confidence < self.uncertain_below:
+            return min(self.max_distance, self.uncertain_distance)
+        return self.max_distance
+
+    def offer(self, frame, confidence=None):
+        """Upload ``frame`` unless it nearly matches a recent upload; returns True if queued."""
+        image = getattr(frame, "image", frame)
+        frame_hash = dhash(image, self.hash_size)
+        threshold = self._threshold(confidence)
+        with self.lock:
+            self.offered += 1
+            for known in self.index:
+                if (frame_hash ^ known).bit_count() <= threshold:
+                    self.index.move_to_end(known)
+                    self.duplicates += 1
+                    return False
+            self.index[frame_hash] = confidence
+            if len(self.index) > self.index_size:
+                self.index.popitem(last=False)
+            self.captured += 1
+        logging.debug(f"Dataset frame captured (hash {frame_hash:016x}, confidence {confidence})")
+        self.logger.log_dataset(image)
+        return True
+
+    def stats(self):
+        return {
+            "offered": self.offered,
+            "captured": self.captured,
+            "duplicates": self.duplicates,
+            "indexed": len(self.index),
+        }
@@ -0,0 +1,241 @@
+import ast
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+import cv2
+import numpy as np
+
+DEFAULT_CLASS_NAMES = ["Bio-degradable", "Hazardous", "Non-biodegradable", "Recyclable"]
+
+# Mirrors the fields of inference's VideoFrame that on_prediction and render_boxes use.
+VideoFrame = namedtuple("VideoFrame", ["image", "frame_id", "frame_timestamp"])
+
+
+class Detector(ABC):
+    @abstractmethod
+    def infer(self, image):
+        """Return a Roboflow-style predictions dict for a BGR image."""
+
+
+def letterbox(image, size, color=(114, 114, 114)):
+    """Resize keeping aspect ratio and pad to ``size`` (width, height)."""
+    height, width = image.shape[:2]
+    target_width, target_height = size
+    scale = min(target_width / width, target_height / height)
+    resized_width, resized_height = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(image, (resized_width, resized_height), interpolation=cv2.INTER_LINEAR)
+    pad_x = (target_width - resized_width) // 2
+    pad_y = (target_height - resized_height) // 2
+    padded = cv2.copyMakeBorder(
+        resized,
+        pad_y,
+        target_height - resized_height - pad_y,
+        pad_x,
+        target_width - resized_width - pad_x,
+        cv2.BORDER_CONSTANT,
+        value=color,
+    )
+    return padded, scale, (pad_x, pad_y)
+
+
+def nms(boxes, scores, iou_threshold):
+    """Greedy non-maximum suppression over (x1, y1, x2, y2) boxes."""
+    order = scores.argsort()[::-1]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        x1 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+class RoboflowDetector(Detector):
+    """Runs a Roboflow model through the ``inference`` package, one frame at a time."""
+
+    def __init__(self, model_id, confidence=0.7, api_key=None):
+        from inference import get_model
+
+        self.model = get_model(model_id, api_key=api_key)
+        self.confidence = confidence
+
+    def infer(self, image):
+        response = self.model.infer(image, confidence=self.confidence)
+        if isinstance(response, list):
+            response = response[0]
+        if hasattr(response, "model_dump"):
+            return response.model_dump(by_alias=True, exclude_none=True)
+        return response.dict(by_alias=True, exclude_none=True)
+
+
+class OnnxDetector(Detector):
+    """Runs an exported YOLO model locally with ONNX Runtime on the CPU.
+
+    Handles both YOLOv8-style outputs ``(1, 4 + classes, N)`` and
+    YOLOv5-style outputs ``(1, N, 5 + classes)``. Class names are read from
+    the model's ``names`` metadata when present, otherwise ``class_names``
+    (in model index order) is used.
+    """
+
+    def __init__(self, model_path, class_names=None, confidence=0.7, iou_threshold=0.5,
+                 providers=("CPUExecutionProvider",), threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, sess_options=options, providers=list(providers))
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        height, width = model_input.shape[2:4]
+        self.input_size = (
+            width if isinstance(width, int) else 640,
+            height if isinstance(height, int) else 640,
+        )
+        self.class_names = self._load_class_names(class_names)
+        self.confidence = confidence
+        self.iou_threshold = iou_threshold
+        logging.info(
+            f"ONNX detector loaded {model_path} (input {self.input_size}, classes {self.class_names})"
+        )
+
+    def _load_class_names(self, class_names):
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if "names" in metadata:
+            try:
+                names = ast.literal_eval(metadata["names"])
+                if isinstance(names, dict):
+                    return [names[i] for i in sorted(names)]
+                return list(names)
+            except (ValueError, SyntaxError) as e:
+                logging.warning(f"Ignoring unreadable class names in model metadata: {e}")
+        return list(class_names or DEFAULT_CLASS_NAMES)
+
+    def _preprocess(self, image):
+        padded, scale, pad = letterbox(image, self.input_size)
+        blob = cv2.cvtColor(padded, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)
+        blob = np.ascontiguousarray(blob[np.newaxis], dtype=np.float32) / 255.0
+        return blob, scale, pad
+
+    def _decode(self, output):
+        output = np.squeeze(output, axis=0)
+        num_classes = len(self.class_names)
+        if output.shape[0] == 4 + num_classes and output.shape[1] != 4 + num_classes:
+            output = output.T
+        if output.shape[1] == 5 + num_classes:
+            class_scores = output[:, 5:] * output[:, 4:5]
+        else:
+            class_scores = output[:, 4:4 + num_classes]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        return output[:, :4], scores, class_ids
+
+    def infer(self, image):
+        height, width = image.shape[:2]
+        blob, scale, (pad_x, pad_y) = self._preprocess(image)
+        output = self.session.run(None, {self.input_name: blob})[0]
+        centers, scores, class_ids = self._decode(output)
+
+        mask = scores >= self.confidence
+        centers, scores, class_ids = centers[mask], scores[mask], class_ids[mask]
+        predictions = []
+        if len(scores):
+            cx = (centers[:, 0] - pad_x) / scale
+            cy = (centers[:, 1] - pad_y) / scale
+            box_width = centers[:, 2] / scale
+            box_height = centers[:, 3] / scale
+            boxes = np.stack(
+                (cx - box_width / 2, cy - box_height / 2, cx + box_width / 2, cy + box_height / 2), axis=1
+            )
+            np.clip(boxes, 0, [width, height, width, height], out=boxes)
+            # Class-aware NMS: offset boxes per class so different classes never suppress each other.
+            offsets = class_ids[:, np.newaxis] * float(max(width, height) + 1)
+            for index in nms(boxes + offsets, scores, self.iou_threshold):
+                x1, y1, x2, y2 = boxes[index]
+                class_id = int(class_ids[index])
+                predictions.append({
+                    "x": float((x1 + x2) / 2),
+                    "y": float((y1 + y2) / 2),
+                    "width": float(x2 - x1),
+                    "height": float(y2 - y1),
+                    "confidence": float(scores[index]),
+                    "class": self.class_names[class_id],
+                    "class_id": class_id,
+                })
+        return {"image": {"width": width, "height": height}, "predictions": predictions}
+
+
+class DetectionPipeline:
+    """Camera loop that feeds frames to a local Detector and calls ``on_prediction``.
+
+    Same callback contract as inference's InferencePipeline:
+    ``on_prediction(predictions, video_frame)``. When a ``frame_gate`` (see
+    ``lib.motion.MotionGate``) is given, frames it rejects skip the detector
+    and go to ``on_frame_skipped(video_frame)`` instead, if set.
+    ``on_frame(video_frame)`` sees every captured frame before gating, e.g.
+    to feed a video stream; it should return quickly.
+    """
+
+    def __init__(self, detector, on_prediction, video_reference=0, reconnect_delay=2, frame_gate=None,
+                 on_frame_skipped=None, on_frame=None):
+        self.detector = detector
+        self.on_prediction = on_prediction
+        self.on_frame = on_frame
+        self.frame_gate = frame_gate
+        self.on_frame_skipped = on_frame_skipped
+        self.video_reference = video_reference
+        self.reconnect_delay = reconnect_delay
+        self._stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def join(self):
+        if self.thread:
+            self.thread.join()
+
+    def terminate(self):
+        self._stop_event.set()
+
+    def _run(self):
+        frame_id = 0
+        camera = None
+        while not self._stop_event.is_set():
+            if camera is None or not camera.isOpened():
+                camera = cv2.VideoCapture(self.video_reference)
+                if not camera.isOpened():
+                    logging.error(f"Could not open video source {self.video_reference}")
+                    self._stop_event.wait(self.reconnect_delay)
+                    continue
+            success, image = camera.read()
+            if not success:
+                logging.warning("Failed to grab frame, reopening video source")
+                camera.release()
+                camera = None
+                continue
+            frame_id += 1
+            video_frame = VideoFrame(image, frame_id, time.time())
+            try:
+                if self.on_frame is not None:
+                    self.on_frame(video_frame)
+                if self.frame_gate is not None and not self.frame_gate.should_infer(image):
+                    if self.on_frame_skipped is not None:
+                        self.on_frame_skipped(video_frame)
+                    continue
+                predictions = self.detector.infer(image)
+                self.on_prediction(predictions, video_frame)
+            except Exception as e:
+                logging.error(f"Error in detection pipeline: {e}", exc_info=True)
+        if camera is not None:
+            camera.release()
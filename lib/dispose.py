@@ -1,66 +1,105 @@
-import RPi.GPIO as GPIO
-import time
 import threading
+from lib.hal import get_hal
 
 class Dispose:
-    def __init__(self, servo_pin_1, servo_pin_2, cooldown_period=2):
+    """Two-axis servo chute driver.
+
+    Each pin keeps one PWM channel for the life of the process. The driver
+    remembers the last commanded angle per servo, skips moves that are
+    already satisfied, drives both servos at the same time and waits only as
+    long as the larger move needs: ``seconds_per_degree`` of travel plus a
+    fixed ``settle_time``. An unknown starting angle is treated as a full
+    180 degree move.
+    """
+
+    def __init__(self, servo_pin_1, servo_pin_2, cooldown_period=0.5, seconds_per_degree=0.003,
+                 settle_time=0.1, drop_time=0.4, rest_angle=90, hal=None):
+        self.hal = hal or get_hal()
+        self.clock = self.hal.clock
         self.SERVO_PIN_1 = servo_pin_1
         self.SERVO_PIN_2 = servo_pin_2
         self.COOLDOWN_PERIOD = cooldown_period
-
-        GPIO.setmode(GPIO.BOARD)
-        GPIO.setwarnings(False)
-        GPIO.setup(self.SERVO_PIN_1, GPIO.OUT)
-        GPIO.setup(self.SERVO_PIN_2, GPIO.OUT)
-
-        self.last_action_time = time.time()
+        self.seconds_per_degree = seconds_per_degree
+        self.settle_time = settle_time
+        self.drop_time = drop_time
+        self.rest_angle = rest_angle
+
+        self.pwm = {}
+        self.angles = {}
+        for pin in (self.SERVO_PIN_1, self.SERVO_PIN_2):
+            self.pwm[pin] = self.hal.servo(pin)
+            self.angles[pin] = None
+
+        # Time the last disposal finished; the cooldown runs from here.
+        self.last_action_time = 0
         self.servo_lock = threading.Lock()
 
-    def set_servo_angle(self, servo_pin, angle):
-        with self.servo_lock:
-            pwm = GPIO.PWM(servo_pin, 50)
-            pwm.start(0)
-            duty = angle / 18 + 2
-            GPIO.output(servo_pin, GPIO.HIGH)
-            pwm.ChangeDutyCycle(duty)
-            time.sleep(1)
-            GPIO.output(servo_pin, GPIO.LOW)
-            pwm.ChangeDutyCycle(0)
-            pwm.stop()
+    def _dwell_time(self, pin, angle):
+        current = self.angles[pin]
+        distance = 180 if current is None else abs(angle - current)
+        return distance * self.seconds_per_degree + self.settle_time
 
-    def dispose(self, servo1_angle, servo2_angle):
-        self.set_servo_angle(self.SERVO_PIN_1, servo1_angle)
-        self.set_servo_angle(self.SERVO_PIN_2, servo2_angle)
-        time.sleep(1)
-        self.set_servo_angle(self.SERVO_PIN_2, 90)
+    def move(self, targets):
+        """Move several servos at once; ``targets`` maps pin to angle."""
+        with self.servo_lock:
+            moves = {pin: angle for pin, angle in targets.items() if self.angles[pin] != angle}
+            if not moves:
+                return 0
+            dwell = max(self._dwell_time(pin, angle) for pin, angle in moves.items())
+            for pin, angle in moves.items():
+                self.pwm[pin].set_duty(angle / 18 + 2)
+            self.clock.sleep(dwell)
+            # Drop the pulse once in position so the servos do not jitter while holding.
+            for pin, angle in moves.items():
+                self.pwm[pin].set_duty(0)
+                self.angles[pin] = angle
+            return dwell
 
-    def dispose_biodegradable(self):
+    def set_servo_angle(self, servo_pin, angle):
+        return self.move({servo_pin: angle})
+
+    def dispose(self, servo1_angle, servo2_angle, on_dropped=None):
+        """Tip the chute toward a bin and return it to rest.
+
+        ``on_dropped`` is called once the item has fallen, before the chute
+        returns, so the next item can be staged while the servo is still moving.
+        """
+        try:
+            self.move({self.SERVO_PIN_1: servo1_angle, self.SERVO_PIN_2: servo2_angle})
+            self.clock.sleep(self.drop_time)
+            if on_dropped is not None:
+                on_dropped()
+            self.move({self.SERVO_PIN_2: self.rest_angle})
+        finally:
+            self.last_action_time = self.clock.time()
+
+    def dispose_biodegradable(self, on_dropped=None):
         print("Performing action: Disposing Biodegradable")
-        self.dispose(0, 0)
+        self.dispose(0, 0, on_dropped)
 
-    def dispose_non_biodegradable(self):
+    def dispose_non_biodegradable(self, on_dropped=None):
         print("Performing action: Disposing Non-Biodegradable")
-        self.dispose(90, 0)
+        self.dispose(90, 0, on_dropped)
 
-    def dispose_recyclable(self):
+    def dispose_recyclable(self, on_dropped=None):
         print("Performing action: Disposing Recyclable")
-        self.dispose(0, 180)
+        self.dispose(0, 180, on_dropped)
 
-    def dispose_hazardous(self):
+    def dispose_hazardous(self, on_dropped=None):
         print("Performing action: Disposing Dangerous/Hazardous Waste")
-        self.dispose(90, 180)
+        self.dispose(90, 180, on_dropped)
 
     def can_perform_action(self):
-        current_time = time.time()
-        if current_time - self.last_action_time >= self.COOLDOWN_PERIOD:
-            self.last_action_time = current_time
+        if self.clock.time() - self.last_action_time >= self.COOLDOWN_PERIOD:
             return True
         else:
             print("Action prevented: Cooldown in effect")
             return False
 
     def cleanup(self):
-        GPIO.cleanup()
+        for pwm in self.pwm.values():
+            pwm.stop()
+        self.hal.cleanup()
 
 def main():
     dispose_system = Dispose(servo_pin_1=35, servo_pin_2=32)
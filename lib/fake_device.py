@@ -0,0 +1,199 @@
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import tty
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.hal.simulated import SensorSignal
+
+
+class FakeSensorDevice:
+    """Pseudo-terminal that speaks the framed sensor protocol.
+
+    Point ``Data(port=device.port, protocol="framed")`` at it to exercise the
+    reader on a machine without the sensor board attached, or run
+    ``python lib/fake_device.py --check`` to push corrupted, zero-field and
+    batched frames through it.
+    """
+
+    def __init__(self, rate=20, batch_size=1, levels=(40, 40, 40, 40), noise=0.5,
+                 corrupt_rate=0.0, zero_sensor=None, outlier_rate=0.0):
+        self.rate = rate
+        self.signal = SensorSignal(
+            levels=levels,
+            noise=noise,
+            outlier_rate=outlier_rate,
+            corrupt_rate=corrupt_rate,
+            zero_sensor=zero_sensor,
+            batch_size=batch_size,
+        )
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        self.frames_sent = 0
+        self._stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+    def _next_frame(self):
+        start_ms = int(time.monotonic() * 1000)
+        return self.signal.frame(
+            [start_ms + int(i * 1000 / self.rate) for i in range(self.signal.batch_size)]
+        )
+
+    def _run(self):
+        interval = self.signal.batch_size / self.rate
+        next_send = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                os.write(self.master_fd, self._next_frame())
+                self.frames_sent += 1
+            except OSError as e:
+                logging.error(f"Fake sensor device write failed: {e}")
+                return
+            next_send += interval
+            self._stop_event.wait(max(0.0, next_send - time.monotonic()))
+
+
+def _collect(duration=2.0, **device_options):
+    from lib.data import Data
+    from lib.hal.real import RealHal
+
+    device = FakeSensorDevice(**device_options).start()
+    data = Data(port=device.port, history_size=1024, protocol="framed", hal=RealHal(), read_timeout=0.1)
+    data.start()
+    try:
+        time.sleep(duration)
+    finally:
+        data.stop()
+        device.stop()
+    return device, data
+
+
+def _offline_reader():
+    from lib.data import Data
+    from lib.hal.real import RealHal
+
+    return Data(history_size=1024, protocol="framed", hal=RealHal())
+
+
+def _corrupt(frame):
+    # Flip one bit in the middle of the frame without creating a 0x00 delimiter.
+    frame = bytearray(frame)
+    middle = len(frame) // 2
+    frame[middle] ^= 0x01 if frame[middle] != 0x01 else 0x02
+    return bytes(frame)
+
+
+def check():
+    """Feed corrupted, zero-field and batched frames into ``Data``; returns the failures.
+
+    The decoder cases replay fixed byte streams with fixed arrival times, so
+    they either always pass or always fail. A short live run over a pty then
+    checks the same path end to end.
+    """
+    from lib.timeseries import SensorHistory
+
+    failures = []
+    random.seed(0)
+
+    # Every third frame corrupted, fed in small chunks that split frames.
+    signal = SensorSignal()
+    stream = b"".join(
+        _corrupt(signal.frame([i * 50])) if i % 3 == 0 else signal.frame([i * 50]) for i in range(30)
+    )
+    data = _offline_reader()
+    for offset in range(0, len(stream), 7):
+        data._feed(stream[offset:offset + 7], 1000.0)
+    stats = data.stats()
+    print(f"corrupted: {stats}")
+    if (stats["frames_decoded"], stats["frames_dropped"], len(data.recent())) != (20, 10, 20):
+        failures.append(f"expected 20 decoded and 10 dropped frames, got {stats}")
+
+    # Protobuf omits zero fields on the wire; they must still read as 0.0.
+    signal = SensorSignal(zero_sensor=2)
+    data = _offline_reader()
+    data._feed(b"".join(signal.frame([i * 50]) for i in range(10)), 1000.0)
+    samples = data.recent()
+    print(f"zero field: {len(samples)} samples")
+    if len(samples) != 10 or any(readings["SENSOR_3"] != 0.0 or not readings["SENSOR_1"] for _, readings in samples):
+        failures.append("zero field was not decoded as 0.0")
+
+    # 10-sample batches every 100 ms of device time, read after uneven delays,
+    # across a wrap of the device's 32-bit millis() counter.
+    signal = SensorSignal(batch_size=10)
+    data = _offline_reader()
+    history = SensorHistory()
+    data.add_listener(history.extend)
+    start_ms = 0xFFFFFFFF - 950
+    delays = (0.05, 0.0, 0.08, 0.01, 0.03, 0.0, 0.09, 0.02)
+    for batch in range(20):
+        timestamps_ms = [start_ms + batch * 100 + i * 10 for i in range(10)]
+        frame = signal.frame([timestamp_ms & 0xFFFFFFFF for timestamp_ms in timestamps_ms])
+        data._feed(frame, 1000.0 + (timestamps_ms[-1] - start_ms) / 1000.0 + delays[batch % len(delays)])
+    samples = data.recent()
+    stored = len(history.query(0, 2000.0)["timestamps"])
+    print(f"batched: {len(samples)} samples, {stored} kept by the history")
+    if len(samples) != 200:
+        failures.append(f"expected 200 batched samples, got {len(samples)}")
+    elif any(later[0] < earlier[0] for earlier, later in zip(samples, samples[1:])):
+        failures.append("batched sample timestamps are out of order")
+    elif stored != 200:
+        failures.append(f"history kept {stored} of 200 batched samples")
+
+    device, data = _collect(rate=100, batch_size=5, corrupt_rate=0.2)
+    samples = data.recent()
+    print(f"live pty: {device.frames_sent} sent, {len(samples)} samples, {data.stats()}")
+    if not samples:
+        failures.append("no samples read from the pty")
+    elif any(later[0] < earlier[0] for earlier, later in zip(samples, samples[1:])):
+        failures.append("live sample timestamps are out of order")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake framed sensor device on a pty")
+    parser.add_argument("--rate", type=float, default=20, help="Samples per second")
+    parser.add_argument("--batch", type=int, default=1, help="Samples per frame")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="Fraction of frames to corrupt")
+    parser.add_argument("--check", action="store_true",
+                        help="Run corrupted, zero-field and batched frames through Data and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check()
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        print("Sensor link check " + ("failed" if failures else "passed"))
+        sys.exit(1 if failures else 0)
+
+    device = FakeSensorDevice(rate=args.rate, batch_size=args.batch, corrupt_rate=args.corrupt).start()
+    print(f"Fake sensor device on {device.port}. Press Ctrl+C to exit.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nStopping fake sensor device.")
+    finally:
+        device.stop()
+
+
+if __name__ == "__main__":
+    main()
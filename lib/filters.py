@@ -0,0 +1,72 @@
+import numpy as np
+
+SENSOR_KEYS = ("SENSOR_1", "SENSOR_2", "SENSOR_3", "SENSOR_4")
+
+
+class SensorFilter:
+    """Median then Kalman filter applied to all bin sensors at once.
+
+    The median over the last ``median_window`` readings rejects single bad
+    echoes; a scalar constant-level Kalman filter per sensor then smooths
+    what is left. The Kalman noise terms are rates, so the response time is
+    the same whatever the sensor protocol and sample rate:
+    ``process_variance`` is how far a level may drift per second (cm^2/s),
+    and ``measurement_variance`` is the noise of one second's worth of
+    readings (cm^2 s), so each reading is weighted by the time it covers.
+    Readings without a timestamp are assumed ``default_interval`` apart.
+
+    The filter's time constant is about ``sqrt(measurement_variance /
+    process_variance)`` seconds. With the defaults, a 40 cm to 5 cm step
+    reads as full (13 cm or less) after about 1.6 s, plus the median's lag
+    of ``median_window // 2`` sample intervals: about 2 s at 5 Hz and
+    4 s at 0.5 Hz.
+    """
+
+    def __init__(self, median_window=5, process_variance=4.0, measurement_variance=4.0,
+                 channels=len(SENSOR_KEYS), default_interval=1.0):
+        if median_window < 1:
+            raise ValueError("median_window must be at least 1")
+        self.median_window = median_window
+        self.process_variance = process_variance
+        self.measurement_variance = measurement_variance
+        self.default_interval = default_interval
+        self.window = np.full((median_window, channels), np.nan, dtype=np.float64)
+        self.index = 0
+        self.estimate = None
+        self.last_timestamp = None
+        self.error_variance = np.full(channels, measurement_variance, dtype=np.float64)
+
+    def update(self, row, timestamp=None):
+        row = np.asarray(row, dtype=np.float64)
+        self.window[self.index] = row
+        self.index = (self.index + 1) % self.median_window
+        median = np.nanmedian(self.window, axis=0)
+
+        if timestamp is None or self.last_timestamp is None:
+            dt = self.default_interval
+        else:
+            # Samples can share a timestamp; keep the step positive.
+            dt = max(1e-3, timestamp - self.last_timestamp)
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+
+        if self.estimate is None:
+            self.estimate = median.copy()
+            return self.estimate.copy()
+
+        self.error_variance += self.process_variance * dt
+        gain = self.error_variance / (self.error_variance + self.measurement_variance / dt)
+        self.estimate += gain * (median - self.estimate)
+        self.error_variance *= 1 - gain
+        return self.estimate.copy()
+
+    def update_readings(self, readings, timestamp=None):
+        filtered = self.update([readings[key] for key in SENSOR_KEYS], timestamp)
+        return {key: float(value) for key, value in zip(SENSOR_KEYS, filtered)}
+
+    def reset(self):
+        self.window.fill(np.nan)
+        self.index = 0
+        self.estimate = None
+        self.last_timestamp = None
+        self.error_variance.fill(self.measurement_variance)
@@ -0,0 +1,43 @@
+"""Hardware abstraction layer.
+
+Servo PWM, serial ports and the clock used for hardware timing all go
+through a ``Hal``. ``RealHal`` drives the Raspberry Pi (RPi.GPIO or pigpio)
+and pyserial; ``SimulatedHal`` models servo travel, ultrasonic noise, GSM
+latency and serial framing so the sorting loop can run on any Linux box,
+optionally faster than real time. ``get_hal()`` returns the backend chosen
+by ``HAL_BACKEND`` in config.
+"""
+
+from lib.hal.base import Clock, Hal, ServoChannel
+
+_default_hal = None
+
+
+def create_hal(backend="real", gpio_driver="rpi", speed=1.0, **kwargs):
+    if backend == "real":
+        from lib.hal.real import RealHal
+
+        return RealHal(gpio_driver, **kwargs)
+    if backend == "sim":
+        from lib.hal.simulated import SimulatedHal
+
+        return SimulatedHal(speed=speed, **kwargs)
+    raise ValueError(f"Unknown HAL backend: {backend}")
+
+
+def get_hal():
+    global _default_hal
+    if _default_hal is None:
+        from config import HAL_BACKEND, GPIO_DRIVER, SIM_SPEED, SENSOR_SERIAL_PORT, SENSOR_PROTOCOL
+
+        kwargs = {}
+        if HAL_BACKEND == "sim":
+            # The simulated board must speak the same wire format Data will read.
+            kwargs = {"sensor_ports": (SENSOR_SERIAL_PORT,), "sensor_protocol": SENSOR_PROTOCOL}
+        _default_hal = create_hal(HAL_BACKEND, gpio_driver=GPIO_DRIVER, speed=SIM_SPEED, **kwargs)
+    return _default_hal
+
+
+def set_hal(hal):
+    global _default_hal
+    _default_hal = hal
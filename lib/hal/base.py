@@ -0,0 +1,46 @@
+import time
+from abc import ABC, abstractmethod
+
+
+class Clock:
+    """Wall clock used by hardware-facing code; simulated backends may run it faster."""
+
+    speed = 1.0
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class ServoChannel(ABC):
+    @abstractmethod
+    def set_duty(self, duty):
+        """Set the 50 Hz PWM duty cycle in percent; 0 stops the pulse."""
+
+    @abstractmethod
+    def stop(self):
+        pass
+
+
+class Hal(ABC):
+    name = "base"
+
+    def __init__(self, clock=None):
+        self.clock = clock or Clock()
+
+    @abstractmethod
+    def servo(self, pin):
+        """Return a ServoChannel for a physical (BOARD-numbered) pin."""
+
+    @abstractmethod
+    def open_serial(self, port, baud_rate, timeout=None):
+        """Return an open pyserial-compatible connection."""
+
+    def cleanup(self):
+        pass
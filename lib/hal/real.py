@@ -0,0 +1,89 @@
+import logging
+import serial
+from lib.hal.base import Hal, ServoChannel
+
+# Physical header pin to BCM GPIO number for the 40-pin Raspberry Pi header.
+BOARD_TO_BCM = {
+    3: 2, 5: 3, 7: 4, 8: 14, 10: 15, 11: 17, 12: 18, 13: 27, 15: 22, 16: 23,
+    18: 24, 19: 10, 21: 9, 22: 25, 23: 11, 24: 8, 26: 7, 27: 0, 28: 1, 29: 5,
+    31: 6, 32: 12, 33: 13, 35: 19, 36: 16, 37: 26, 38: 20, 40: 21,
+}
+
+
+class RPiGpioServo(ServoChannel):
+    def __init__(self, gpio, pin):
+        gpio.setup(pin, gpio.OUT)
+        self.pwm = gpio.PWM(pin, 50)
+        self.pwm.start(0)
+
+    def set_duty(self, duty):
+        self.pwm.ChangeDutyCycle(duty)
+
+    def stop(self):
+        self.pwm.stop()
+
+
+class PigpioServo(ServoChannel):
+    """Hardware-timed servo pulses through the pigpio daemon (no software PWM jitter)."""
+
+    def __init__(self, pi, pin):
+        self.pi = pi
+        self.gpio = BOARD_TO_BCM[pin]
+
+    def set_duty(self, duty):
+        if duty <= 0:
+            self.pi.set_servo_pulsewidth(self.gpio, 0)
+            return
+        # Callers use duty = angle / 18 + 2; pigpio only accepts 500-2500 us,
+        # so map 0-180 deg across that range rather than converting the duty.
+        angle = (duty - 2) * 18
+        pulse = 500 + angle / 180 * 2000
+        self.pi.set_servo_pulsewidth(self.gpio, int(min(2500, max(500, pulse))))
+
+    def stop(self):
+        self.pi.set_servo_pulsewidth(self.gpio, 0)
+
+
+class RealHal(Hal):
+    name = "real"
+
+    def __init__(self, gpio_driver="rpi", clock=None):
+        super().__init__(clock)
+        if gpio_driver not in ("rpi", "pigpio"):
+            raise ValueError(f"Unknown GPIO driver: {gpio_driver}")
+        self.gpio_driver = gpio_driver
+        self._gpio = None
+        self._pi = None
+
+    def _rpi_gpio(self):
+        if self._gpio is None:
+            import RPi.GPIO as GPIO
+
+            GPIO.setmode(GPIO.BOARD)
+            GPIO.setwarnings(False)
+            self._gpio = GPIO
+        return self._gpio
+
+    def _pigpio(self):
+        if self._pi is None:
+            import pigpio
+
+            self._pi = pigpio.pi()
+            if not self._pi.connected:
+                raise RuntimeError("Cannot connect to pigpiod. Run 'sudo pigpiod' first.")
+        return self._pi
+
+    def servo(self, pin):
+        if self.gpio_driver == "pigpio":
+            return PigpioServo(self._pigpio(), pin)
+        return RPiGpioServo(self._rpi_gpio(), pin)
+
+    def open_serial(self, port, baud_rate, timeout=None):
+        return serial.Serial(port, baud_rate, timeout=timeout)
+
+    def cleanup(self):
+        if self._gpio is not None:
+            self._gpio.cleanup()
+        if self._pi is not None:
+            self._pi.stop()
+        logging.info("GPIO cleaned up")
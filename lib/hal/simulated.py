@@ -0,0 +1,339 @@
+import logging
+import random
+import threading
+import time
+import serial
+from lib.hal.base import Clock, Hal, ServoChannel
+from proto import trashscan_protocol_pb2
+from proto.framing import MSG_BIN_STATUS, MSG_BIN_STATUS_BATCH, encode_frame
+
+
+class SimulatedClock(Clock):
+    """Clock that runs ``speed`` times faster than real time."""
+
+    def __init__(self, speed=1.0):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self._wall_start = time.time()
+        self._mono_start = time.monotonic()
+
+    def time(self):
+        return self._wall_start + (time.monotonic() - self._mono_start) * self.speed
+
+    def monotonic(self):
+        return self._mono_start + (time.monotonic() - self._mono_start) * self.speed
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+
+class SimulatedServo(ServoChannel):
+    """Servo that slews toward the commanded angle at ``degrees_per_second``."""
+
+    def __init__(self, clock, pin, degrees_per_second=333.0, start_angle=90.0):
+        self.clock = clock
+        self.pin = pin
+        self.degrees_per_second = degrees_per_second
+        self._angle = start_angle
+        self._target = start_angle
+        self._since = clock.monotonic()
+        self.moves = 0
+        self.powered = False
+
+    @property
+    def angle(self):
+        if not self.powered:
+            return self._angle
+        elapsed = self.clock.monotonic() - self._since
+        step = elapsed * self.degrees_per_second
+        if abs(self._target - self._angle) <= step:
+            return self._target
+        return self._angle + step * (1 if self._target > self._angle else -1)
+
+    def set_duty(self, duty):
+        self._angle = self.angle
+        self._since = self.clock.monotonic()
+        if duty <= 0:
+            if self.powered and self._angle != self._target:
+                logging.warning(
+                    f"Simulated servo on pin {self.pin} unpowered at {self._angle:.0f} deg, short of {self._target:.0f}"
+                )
+            self.powered = False
+            return
+        self.powered = True
+        self._target = (duty - 2) * 18
+        self.moves += 1
+
+    def stop(self):
+        self.set_duty(0)
+
+
+class SensorSignal:
+    """Ultrasonic bin-level model that produces BIN_STATUS messages.
+
+    Readings are the bin levels in cm plus Gaussian noise; with probability
+    ``outlier_rate`` a reading is replaced by a spurious echo anywhere in
+    ``outlier_range``. ``fill_rate`` lowers every level by that many cm per
+    second of (simulated) time. ``frame`` builds a COBS/CRC frame and
+    ``packet`` a fixed 20-byte legacy message.
+    """
+
+    def __init__(self, levels=(40, 40, 40, 40), noise=0.5, outlier_rate=0.0, outlier_range=(2, 400),
+                 fill_rate=0.0, corrupt_rate=0.0, zero_sensor=None, batch_size=1):
+        self.levels = [float(level) for level in levels]
+        self.noise = noise
+        self.outlier_rate = outlier_rate
+        self.outlier_range = outlier_range
+        self.fill_rate = fill_rate
+        self.corrupt_rate = corrupt_rate
+        self.zero_sensor = zero_sensor
+        self.batch_size = batch_size
+        self.sequence = 0
+
+    def advance(self, seconds):
+        if self.fill_rate:
+            self.levels = [max(0.0, level - self.fill_rate * seconds) for level in self.levels]
+
+    def reading(self):
+        values = []
+        for level in self.levels:
+            if self.outlier_rate and random.random() < self.outlier_rate:
+                values.append(random.uniform(*self.outlier_range))
+            else:
+                values.append(max(0.0, level + random.gauss(0, self.noise)))
+        if self.zero_sensor is not None:
+            values[self.zero_sensor] = 0.0
+        return values
+
+    def frame(self, timestamps_ms):
+        if len(timestamps_ms) == 1:
+            values = self.reading()
+            message = trashscan_protocol_pb2.BIN_STATUS(
+                SENSOR_1=values[0], SENSOR_2=values[1], SENSOR_3=values[2], SENSOR_4=values[3]
+            )
+            msg_type = MSG_BIN_STATUS
+        else:
+            message = trashscan_protocol_pb2.BIN_STATUS_BATCH()
+            for timestamp_ms in timestamps_ms:
+                values = self.reading()
+                message.TIMESTAMP_MS.append(timestamp_ms & 0xFFFFFFFF)
+                message.SENSOR_1.append(values[0])
+                message.SENSOR_2.append(values[1])
+                message.SENSOR_3.append(values[2])
+                message.SENSOR_4.append(values[3])
+            msg_type = MSG_BIN_STATUS_BATCH
+        frame = encode_frame(msg_type, message, self.sequence)
+        self.sequence = (self.sequence + 1) & 0xFF
+        if self.corrupt_rate and random.random() < self.corrupt_rate:
+            frame = bytearray(frame)
+            frame[random.randrange(len(frame) - 1)] ^= 0x5A
+            frame = bytes(frame)
+        return frame
+
+    def packet(self):
+        # Protobuf omits 0.0 fields, which would shorten the packet; -0.0 keeps all 20 bytes.
+        values = [value or -0.0 for value in self.reading()]
+        packet = trashscan_protocol_pb2.BIN_STATUS(
+            SENSOR_1=values[0], SENSOR_2=values[1], SENSOR_3=values[2], SENSOR_4=values[3]
+        ).SerializeToString()
+        if self.corrupt_rate and random.random() < self.corrupt_rate:
+            packet = bytearray(packet)
+            packet[random.randrange(len(packet))] ^= 0x5A
+            packet = bytes(packet)
+        return packet
+
+
+class SimulatedSerial:
+    """Minimal pyserial stand-in whose incoming bytes are scheduled on a clock."""
+
+    def __init__(self, clock, port, baud_rate, timeout=None):
+        self.clock = clock
+        self.port = port
+        self.baudrate = baud_rate
+        self.timeout = timeout
+        self.is_open = True
+        self.buffer = bytearray()
+        self.lock = threading.Lock()
+
+    def _fill(self):
+        pass
+
+    def _check_open(self):
+        if not self.is_open:
+            raise serial.SerialException(f"Simulated port {self.port} is closed")
+
+    @property
+    def in_waiting(self):
+        self._check_open()
+        with self.lock:
+            self._fill()
+            return len(self.buffer)
+
+    def read(self, size=1):
+        deadline = None if self.timeout is None else self.clock.monotonic() + self.timeout
+        while True:
+            self._check_open()
+            with self.lock:
+                self._fill()
+                if self.buffer:
+                    data = bytes(self.buffer[:size])
+                    del self.buffer[:size]
+                    return data
+            if deadline is not None and self.clock.monotonic() >= deadline:
+                return b""
+            self.clock.sleep(0.01)
+
+    def write(self, data):
+        self._check_open()
+        return len(data)
+
+    def reset_input_buffer(self):
+        with self.lock:
+            self.buffer.clear()
+
+    def close(self):
+        self.is_open = False
+
+
+class SimulatedSensorSerial(SimulatedSerial):
+    """Sensor board link: emits readings at ``rate`` Hz, limited by the baud rate.
+
+    ``protocol`` matches ``Data``: ``"framed"`` sends COBS/CRC frames of
+    ``signal.batch_size`` samples, ``"legacy"`` one 20-byte BIN_STATUS
+    packet per sample.
+    """
+
+    def __init__(self, clock, port, baud_rate, timeout=None, signal=None, rate=20, protocol="framed"):
+        if protocol not in ("framed", "legacy"):
+            raise ValueError(f"Unknown sensor protocol: {protocol}")
+        super().__init__(clock, port, baud_rate, timeout)
+        self.signal = signal or SensorSignal()
+        self.rate = rate
+        self.protocol = protocol
+        self.next_sample = clock.monotonic()
+        self.wire_free_at = self.next_sample
+        self.in_flight = []
+
+    def _fill(self):
+        now = self.clock.monotonic()
+        interval = 1.0 / self.rate
+        # Ten bits per byte on the wire (start, 8 data, stop).
+        byte_time = 10.0 / self.baudrate
+        batch_size = 1 if self.protocol == "legacy" else self.signal.batch_size
+        while self.next_sample + interval * (batch_size - 1) <= now:
+            self.signal.advance(interval * batch_size)
+            if self.protocol == "legacy":
+                frame = self.signal.packet()
+            else:
+                frame = self.signal.frame(
+                    [int((self.next_sample + i * interval) * 1000) for i in range(batch_size)]
+                )
+            ready_at = self.next_sample + interval * (batch_size - 1)
+            self.wire_free_at = max(self.wire_free_at, ready_at) + len(frame) * byte_time
+            self.in_flight.append((self.wire_free_at, frame))
+            self.next_sample += interval * batch_size
+        while self.in_flight and self.in_flight[0][0] <= now:
+            self.buffer += self.in_flight.pop(0)[1]
+
+
+class SimulatedModemSerial(SimulatedSerial):
+    """GSM link: every command written is acknowledged with ``OK`` after ``latency`` seconds."""
+
+    def __init__(self, clock, port, baud_rate, timeout=None, latency=1.5, failure_rate=0.0):
+        super().__init__(clock, port, baud_rate, timeout)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.pending = []
+        self.received = []
+
+    def write(self, data):
+        self._check_open()
+        reply = b"ERROR\r\n" if self.failure_rate and random.random() < self.failure_rate else b"OK\r\n"
+        with self.lock:
+            self.received.append(bytes(data))
+            self.pending.append((self.clock.monotonic() + self.latency, reply))
+        return len(data)
+
+    def _fill(self):
+        now = self.clock.monotonic()
+        ready = [reply for due, reply in self.pending if due <= now]
+        if ready:
+            self.pending = [(due, reply) for due, reply in self.pending if due > now]
+            for reply in ready:
+                self.buffer += reply
+
+
+class SimulatedHal(Hal):
+    """Timing-accurate stand-in for the servos, sensor board and GSM modem.
+
+    Ports listed in ``sensor_ports`` get a simulated sensor board speaking
+    ``sensor_protocol``; any other port is treated as the GSM modem.
+    ``speed`` runs the shared clock faster than real time so long runs
+    finish quickly.
+    """
+
+    name = "sim"
+
+    def __init__(self, speed=1.0, sensor_ports=("/dev/ttyACM0",), sensor_rate=20, signal=None,
+                 servo_degrees_per_second=333.0, modem_latency=1.5, sensor_protocol="framed"):
+        super().__init__(SimulatedClock(speed))
+        self.sensor_ports = set(sensor_ports)
+        self.sensor_rate = sensor_rate
+        self.sensor_protocol = sensor_protocol
+        self.signal = signal or SensorSignal()
+        self.servo_degrees_per_second = servo_degrees_per_second
+        self.modem_latency = modem_latency
+        self.servos = {}
+        self.ports = {}
+
+    def servo(self, pin):
+        channel = SimulatedServo(self.clock, pin, self.servo_degrees_per_second)
+        self.servos[pin] = channel
+        return channel
+
+    def open_serial(self, port, baud_rate, timeout=None):
+        if port in self.sensor_ports:
+            connection = SimulatedSensorSerial(
+                self.clock, port, baud_rate, timeout, signal=self.signal, rate=self.sensor_rate,
+                protocol=self.sensor_protocol,
+            )
+        else:
+            connection = SimulatedModemSerial(self.clock, port, baud_rate, timeout, latency=self.modem_latency)
+        self.ports[port] = connection
+        return connection
+
+
+def main():
+    import argparse
+    from lib.actuator import ActuationWorker, DISPOSE_ACTIONS
+    from lib.dispose import Dispose
+
+    parser = argparse.ArgumentParser(description="Disposal throughput on the simulated HAL")
+    parser.add_argument("--items", type=int, default=50, help="Number of items to dispose")
+    parser.add_argument("--speed", type=float, default=20.0, help="Simulated clock speed-up")
+    parser.add_argument("--confirm_time", type=float, default=2.0, help="Seconds to confirm each item")
+    parser.add_argument("--serial", action="store_true", help="Wait for full completion before confirming")
+    args = parser.parse_args()
+
+    hal = SimulatedHal(speed=args.speed)
+    dispose = Dispose(35, 32, hal=hal)
+    done = threading.Semaphore(0)
+    actuator = ActuationWorker(dispose, on_complete=lambda event: done.release(), cooldown=dispose.COOLDOWN_PERIOD)
+    detections = list(DISPOSE_ACTIONS)
+
+    start = hal.clock.monotonic()
+    for i in range(args.items):
+        while not (actuator.idle if args.serial else actuator.chute_clear):
+            hal.clock.sleep(0.01)
+        hal.clock.sleep(args.confirm_time)
+        actuator.submit(detections[i % len(detections)])
+    for _ in range(args.items):
+        done.acquire()
+    elapsed = hal.clock.monotonic() - start
+    print(f"{args.items} items in {elapsed:.1f} simulated seconds ({args.items / elapsed * 60:.1f} items/min)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import random
+import threading
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class TablePolicy:
+    """How AsyncLogger treats the rows of one table before they are spooled.
+
+    ``priority`` orders both spooling and uploading (0 goes first) and
+    decides what is dropped first when the spool is full. ``flush_interval``
+    overrides the logger's batching delay for the table; 0 uploads as soon
+    as possible. ``max_queue`` bounds the table's in-memory queue.
+
+    ``max_rate`` caps rows per second: each ``sample_window`` keeps a
+    uniform reservoir sample of ``max_rate * sample_window`` rows and
+    releases it when the window closes. Rows travel as ``(log_type, data)``
+    pairs, so sampled rows keep the log type they were logged with.
+    ``change_only`` skips rows whose numeric fields all moved by no more
+    than ``epsilon`` since the last logged row, but still logs one every
+    ``heartbeat`` seconds if set.
+    """
+
+    def __init__(self, priority=PRIORITY_NORMAL, flush_interval=None, max_queue=10000, max_rate=None,
+                 sample_window=1.0, change_only=False, epsilon=0.0, heartbeat=None):
+        self.priority = priority
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_rate = max_rate
+        self.sample_window = sample_window
+        self.change_only = change_only
+        self.epsilon = epsilon
+        self.heartbeat = heartbeat
+        self.lock = threading.Lock()
+        self.accepted = 0
+        self.sampled_out = 0
+        self.unchanged = 0
+        self._reservoir = []
+        self._window_start = None
+        self._seen = 0
+        self._last = None
+        self._last_time = 0
+
+    def _changed(self, data, now):
+        if self._last is None or self._last.keys() != data.keys():
+            return True
+        if self.heartbeat is not None and now - self._last_time >= self.heartbeat:
+            return True
+        for key, value in data.items():
+            previous = self._last[key]
+            if isinstance(value, (int, float)) and isinstance(previous, (int, float)):
+                if abs(value - previous) > self.epsilon:
+                    return True
+            elif value != previous:
+                return True
+        return False
+
+    def _roll(self, now):
+        if self._window_start is None:
+            self._window_start = now
+            return []
+        if now - self._window_start < self.sample_window:
+            return []
+        ready = self._reservoir
+        self._reservoir = []
+        self._seen = 0
+        self._window_start = now
+        return ready
+
+    def admit(self, data, now, log_type=None):
+        """Offer one row; returns the ``(log_type, data)`` rows (possibly none) to queue now."""
+        with self.lock:
+            if self.change_only:
+                if not self._changed(data, now):
+                    self.unchanged += 1
+                    return []
+                self._last = dict(data)
+                self._last_time = now
+            self.accepted += 1
+            if self.max_rate is None:
+                return [(log_type, data)]
+
+            ready = self._roll(now)
+            self._seen += 1
+            size = max(1, int(self.max_rate * self.sample_window))
+            if len(self._reservoir) < size:
+                self._reservoir.append((log_type, data))
+            else:
+                self.sampled_out += 1
+                index = random.randrange(self._seen)
+                if index < size:
+                    self._reservoir[index] = (log_type, data)
+            return ready
+
+    def collect(self, now):
+        """Rows whose sampling window has closed, for when no new rows arrive to close it."""
+        if self.max_rate is None:
+            return []
+        with self.lock:
+            return self._roll(now)
+
+    def stats(self):
+        return {
+            "priority": self.priority,
+            "accepted": self.accepted,
+            "sampled_out": self.sampled_out,
+            "unchanged": self.unchanged,
+        }
+
+
+def default_policies(prediction_rate=1.0, bin_level_epsilon=1.0, bin_level_heartbeat=300):
+    """Policies for the tables this project logs to."""
+    return {
+        "dispose_log": TablePolicy(priority=PRIORITY_HIGH, flush_interval=0, max_queue=1000),
+        "alert_log": TablePolicy(priority=PRIORITY_HIGH, flush_interval=0, max_queue=1000),
+        "bin_levels": TablePolicy(
+            priority=PRIORITY_NORMAL,
+            max_queue=1000,
+            change_only=True,
+            epsilon=bin_level_epsilon,
+            heartbeat=bin_level_heartbeat,
+        ),
+        "prediction_log": TablePolicy(priority=PRIORITY_LOW, max_queue=5000, max_rate=prediction_rate),
+    }
@@ -0,0 +1,85 @@
+import logging
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Cheap per-frame check for whether the model needs to run at all.
+
+    Frames are compared on a small blurred grayscale copy. With the default
+    ``"diff"`` method the reference is a slowly adapting running average, so
+    an object that stops in the chute still counts as present for a while;
+    ``"mog2"`` uses OpenCV's MOG2 background subtractor instead. A frame
+    passes when at least ``min_area`` of its pixels changed by more than
+    ``threshold`` grey levels. After motion stops, frames keep passing for
+    ``hold_time`` seconds, and one frame is let through every
+    ``refresh_interval`` seconds regardless.
+    """
+
+    def __init__(self, threshold=25, min_area=0.01, scale_width=160, learning_rate=0.02,
+                 hold_time=1.5, refresh_interval=10.0, method="diff"):
+        if method not in ("diff", "mog2"):
+            raise ValueError(f"Unknown motion gate method: {method}")
+        self.threshold = threshold
+        self.min_area = min_area
+        self.scale_width = scale_width
+        self.learning_rate = learning_rate
+        self.hold_time = hold_time
+        self.refresh_interval = refresh_interval
+        self.method = method
+        self.background = None
+        self.subtractor = (
+            cv2.createBackgroundSubtractorMOG2(detectShadows=False) if method == "mog2" else None
+        )
+        self.last_motion_time = 0
+        self.last_pass_time = 0
+        self.frames_passed = 0
+        self.frames_skipped = 0
+
+    def _downscale(self, image):
+        height, width = image.shape[:2]
+        scale_height = max(1, int(height * self.scale_width / width))
+        small = cv2.resize(image, (self.scale_width, scale_height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def motion_fraction(self, image):
+        gray = self._downscale(image)
+        if self.subtractor is not None:
+            mask = self.subtractor.apply(gray, learningRate=self.learning_rate)
+            return np.count_nonzero(mask) / mask.size
+
+        frame = gray.astype(np.float32)
+        if self.background is None or self.background.shape != frame.shape:
+            self.background = frame
+            return 1.0
+        difference = cv2.absdiff(frame, self.background)
+        cv2.accumulateWeighted(frame, self.background, self.learning_rate)
+        return np.count_nonzero(difference > self.threshold) / difference.size
+
+    def should_infer(self, image):
+        current_time = time.time()
+        if self.motion_fraction(image) >= self.min_area:
+            self.last_motion_time = current_time
+
+        if (
+            current_time - self.last_motion_time <= self.hold_time
+            or current_time - self.last_pass_time >= self.refresh_interval
+        ):
+            self.last_pass_time = current_time
+            self.frames_passed += 1
+            return True
+
+        self.frames_skipped += 1
+        return False
+
+    def stats(self):
+        return {"frames_passed": self.frames_passed, "frames_skipped": self.frames_skipped}
+
+    def reset(self):
+        self.background = None
+        if self.subtractor is not None:
+            self.subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+        logging.info("Motion gate reset")
@@ -0,0 +1,87 @@
+import logging
+import queue
+import threading
+import time
+
+BIN_SENSORS = {
+    "bio": "SENSOR_1",
+    "non": "SENSOR_2",
+    "rec": "SENSOR_3",
+    "haz": "SENSOR_4",
+}
+
+
+class NotificationScheduler:
+    """Turns bin-level readings into "bin full" notifications without blocking.
+
+    ``update`` only compares readings against per-bin state and enqueues
+    work; SMS, alert and log side effects run on the scheduler's own worker.
+    A bin becomes full when its reading drops to ``full_threshold`` and is
+    only cleared once it rises back above ``full_threshold + hysteresis``,
+    so readings hovering around the threshold do not re-trigger.
+    ``min_interval`` caps how often a single bin can notify; a notification
+    that falls inside the interval is deferred, not dropped.
+    """
+
+    def __init__(self, sms, logger, alert, full_threshold=13, hysteresis=5, min_interval=60):
+        self.sms = sms
+        self.logger = logger
+        self.alert = alert
+        self.full_threshold = full_threshold
+        self.clear_threshold = full_threshold + hysteresis
+        self.min_interval = min_interval
+        self.full = {bin_type: False for bin_type in BIN_SENSORS}
+        self.pending = {bin_type: False for bin_type in BIN_SENSORS}
+        self.last_sent = {bin_type: 0 for bin_type in BIN_SENSORS}
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def update(self, readings):
+        current_time = time.time()
+        for bin_type, sensor_key in BIN_SENSORS.items():
+            value = readings.get(sensor_key)
+            if value is None:
+                continue
+            if not self.full[bin_type] and value <= self.full_threshold:
+                self.full[bin_type] = True
+                self.pending[bin_type] = True
+            elif self.full[bin_type] and value > self.clear_threshold:
+                self.full[bin_type] = False
+                self.pending[bin_type] = False
+                logging.info(f"{bin_type} bin cleared (level {value})")
+
+            if self.pending[bin_type] and current_time - self.last_sent[bin_type] >= self.min_interval:
+                self.pending[bin_type] = False
+                self.last_sent[bin_type] = current_time
+                self.queue.put(bin_type)
+
+    def _worker(self):
+        while True:
+            bin_type = self.queue.get()
+            try:
+                self._notify(bin_type)
+            finally:
+                self.queue.task_done()
+
+    def _notify(self, bin_type):
+        logging.info(f"Bin full notification: {bin_type}")
+        for action in (
+            lambda: self.sms.send_notification(bin_type),
+            lambda: self.logger.log_alert({"bin_type": bin_type}),
+            lambda: self.alert.play_alert(bin_type),
+        ):
+            try:
+                action()
+            except Exception as e:
+                logging.error(f"Notification side effect failed for {bin_type}: {e}")
+
+    def status(self):
+        return {
+            bin_type: {
+                "full": self.full[bin_type],
+                "pending": self.pending[bin_type],
+                "last_sent": self.last_sent[bin_type],
+            }
+            for bin_type in BIN_SENSORS
+        }
@@ -1,67 +1,64 @@
-import time
 import serial
 from alerts.alert import Alert
 from lib.data import Data
 from lib.sms import Sms
 from lib.async_logger import AsyncLogger
+from lib.notifier import NotificationScheduler
+from lib.timeseries import SensorHistory
+from lib.filters import SensorFilter
+from lib.broadcast import SensorBroadcaster, SensorSnapshot
 from flask_socketio import SocketIO
 
 class Polybin:
-    def __init__(self, port, socketio: SocketIO, logger: AsyncLogger):
-        self.bin_system = Sms(port=port)
+    def __init__(self, port, socketio: SocketIO, logger: AsyncLogger, sensor_port="/dev/ttyACM0",
+                 sensor_baud_rate=19200, sensor_protocol="legacy", signal_filter=None,
+                 broadcaster=None, alert=None, sms=None, full_threshold=13):
+        self.bin_system = sms or Sms(port=port)
+        self.sensor = Data(port=sensor_port, baud_rate=sensor_baud_rate, protocol=sensor_protocol)
+        self.sensor_sequence = 0
+        self.history = SensorHistory()
+        self.signal_filter = signal_filter or SensorFilter()
+        self.sensor.add_listener(self.history.extend)
+        self.sensor.add_listener(self._filter_samples)
         self.socketio = socketio
+        self.broadcaster = broadcaster or SensorBroadcaster(socketio)
         self.logger = logger
+        # One threshold for both the notifier's hysteresis band and check_thresholds.
+        self.full_threshold = full_threshold
         self.latest_data = {
             "SENSOR_1": 40,  # Biodegradable
             "SENSOR_2": 40,  # Non-biodegradable
             "SENSOR_3": 40,  # Recyclable
             "SENSOR_4": 40,  # Hazardous
         }
-        self.notification_sent = {
-            "bio": False,
-            "non": False,
-            "rec": False,
-            "haz": False,
-        }
-        self.last_notification_time = time.time()
-        self.alert = Alert()
+        self.latest_raw = dict(self.latest_data)
+        self.latest_filtered = dict(self.latest_data)
+        self.snapshot = SensorSnapshot(self.latest_data, epsilon=self.broadcaster.epsilon)
+        self.alert = alert or Alert()
+        self.notifier = NotificationScheduler(self.bin_system, logger, self.alert, full_threshold=full_threshold)
+        self.sensor.start()
+
+    def _filter_samples(self, samples):
+        for timestamp, readings in samples:
+            self.latest_filtered = self.signal_filter.update_readings(readings, timestamp)
 
-    def update_sensor_data(self):
-        sensor = Data()
+    def update_sensor_data(self, timeout=2):
+        sensor = self.sensor
         try:
-            if sensor.check_transmission():
-                sensor.retrieve_data()
-                self.latest_data = {
-                    "SENSOR_1": sensor.sensor_1,
-                    "SENSOR_2": sensor.sensor_2,
-                    "SENSOR_3": sensor.sensor_3,
-                    "SENSOR_4": sensor.sensor_4,
-                }
-                self.socketio.emit("sensor_update", self.latest_data)
+            sequence = sensor.wait_for_sample(self.sensor_sequence, timeout=timeout)
+            if sequence != self.sensor_sequence and sensor.latest is not None:
+                self.sensor_sequence = sequence
+                _, readings = sensor.latest
+                self.latest_raw = dict(readings)
+                self.latest_data = self.latest_filtered
+                self.broadcaster.publish(self.latest_data)
+                self.snapshot.update(self.latest_data)
                 self.logger.log_bin_status(self.latest_data)
-                if time.time() - self.last_notification_time >= 10:
-                    self.last_notification_time = time.time()
-                    self.check_and_notify("bio", sensor.sensor_1, 13)
-                    self.check_and_notify("non", sensor.sensor_2, 13)
-                    self.check_and_notify("rec", sensor.sensor_3, 13)
-                    self.check_and_notify("haz", sensor.sensor_4, 13)
+                self.notifier.update(self.latest_data)
         except serial.SerialException:
             print("Serial connection issue.")
         except Exception as e:
             print(f"Error: {e}")
-        finally:
-            self.socketio.emit("sensor_update", self.latest_data)
-        time.sleep(2)
-
-    def check_and_notify(self, bin_type, sensor_value, threshold):
-        if sensor_value <= threshold and not self.notification_sent[bin_type]:
-            self.bin_system.send_notification(bin_type)
-            self.logger.log_alert({"bin_type": bin_type})
-            self.alert.play_alert(bin_type)
-            self.notification_sent[bin_type] = True
-        elif sensor_value > threshold:
-            self.notification_sent[bin_type] = False
-        time.sleep(5)
 
     def check_thresholds(self):
-        return {sensor: data > 13 for sensor, data in self.latest_data.items()}
\ No newline at end of file
+        return {sensor: data > self.full_threshold for sensor, data in self.latest_data.items()}
\ No newline at end of file
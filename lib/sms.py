@@ -1,27 +1,225 @@
-import serial
+import logging
+import queue
+import threading
 import time
+import serial
+from lib.hal import get_hal
+
+COMMANDS = {
+    'bio': 'a',
+    'non': 'b',
+    'rec': 'c',
+    'haz': 'd'
+}
+
+BIN_NAMES = {
+    'bio': 'Biodegradable',
+    'non': 'Non-biodegradable',
+    'rec': 'Recyclable',
+    'haz': 'Hazardous'
+}
+
 
 class Sms:
-    def __init__(self, port="/dev/ttyUSB0", baud_rate=9600):
-        self.serial_connection = serial.Serial(port, baud_rate, timeout=1)
-        time.sleep(2)
+    """Bin-full notifications over the GSM link, sent from a worker thread.
+
+    ``send_notification`` only records the request and returns. The worker
+    owns the serial port: it opens it (waiting ``warmup`` seconds for the
+    board to reset) on its own thread, so startup never blocks on the modem.
+    Requests arriving within ``batch_window`` seconds of each other are
+    deduplicated and delivered together.
+
+    With ``protocol="char"`` each bin is one command character for the
+    notification board, and the reply line (``OK``/``ERROR``) is read with
+    ``ack_timeout``; a board that does not answer leaves the delivery
+    ``unconfirmed`` rather than risking a duplicate SMS. With
+    ``protocol="at"`` the worker drives a GSM modem directly and sends one
+    text to ``phone_number`` listing every bin in the batch. Failed
+    deliveries are retried up to ``max_retries`` times with exponential
+    backoff from ``retry_delay``.
+    """
+
+    def __init__(self, port="/dev/ttyUSB0", baud_rate=9600, hal=None, protocol="char", phone_number=None,
+                 batch_window=2.0, ack_timeout=5.0, max_retries=3, retry_delay=2.0, warmup=2.0):
+        if protocol not in ("char", "at"):
+            raise ValueError(f"Unknown SMS protocol: {protocol}")
+        if protocol == "at" and not phone_number:
+            raise ValueError("The at protocol needs a phone number")
+        self.hal = hal or get_hal()
+        self.clock = self.hal.clock
+        self.port = port
+        self.baud_rate = baud_rate
+        self.protocol = protocol
+        self.phone_number = phone_number
+        self.batch_window = batch_window
+        self.ack_timeout = ack_timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.warmup = warmup
+        self.serial_connection = None
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.deliveries = {}
+        self.deduplicated = 0
+        self.batches = 0
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
     def send_notification(self, bin_type):
-        commands = {
-            'bio': 'a',
-            'non': 'b',
-            'rec': 'c',
-            'haz': 'd'
-        }
-        if bin_type in commands:
-            print(f"Sending notification for {bin_type} bin.")
-            self.serial_connection.write(commands[bin_type].encode())
-        else:
+        if bin_type not in COMMANDS:
             print("Invalid or Error")
-            
+            return False
+        with self.lock:
+            delivery = self.deliveries.get(bin_type)
+            if delivery is not None and delivery["state"] in ("queued", "sending"):
+                self.deduplicated += 1
+                return False
+            self.deliveries[bin_type] = {
+                "state": "queued",
+                "attempts": 0,
+                "queued_at": time.time(),
+                "sent_at": None,
+                "error": None,
+            }
+        print(f"Sending notification for {bin_type} bin.")
+        self.queue.put(bin_type)
+        return True
+
+    def _set_state(self, bin_types, state, **fields):
+        with self.lock:
+            for bin_type in bin_types:
+                self.deliveries[bin_type].update(state=state, **fields)
+
+    def _connect(self):
+        if self.serial_connection is not None and self.serial_connection.is_open:
+            return self.serial_connection
+        self.serial_connection = self.hal.open_serial(self.port, self.baud_rate, timeout=0.1)
+        # Opening the port resets the notification board; give it time to boot.
+        self.clock.sleep(self.warmup)
+        return self.serial_connection
+
+    def _disconnect(self):
+        if self.serial_connection is not None:
+            try:
+                self.serial_connection.close()
+            except Exception:
+                pass
+        self.serial_connection = None
+
+    def _worker(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = self.clock.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - self.clock.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    bin_type = self.queue.get(timeout=remaining / self.clock.speed)
+                except queue.Empty:
+                    break
+                if bin_type not in batch:
+                    batch.append(bin_type)
+            self.batches += 1
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                logging.error(f"SMS dispatch failed for {batch}: {e}")
+                self._set_state(batch, "failed", error=str(e))
+
+    def _deliver(self, batch):
+        for attempt in range(self.max_retries + 1):
+            self._set_state(batch, "sending", attempts=attempt + 1)
+            try:
+                connection = self._connect()
+                if self.protocol == "at":
+                    result = self._send_at(connection, batch)
+                else:
+                    result = self._send_chars(connection, batch)
+            except (serial.SerialException, OSError) as e:
+                self._disconnect()
+                result = {bin_type: ("failed", str(e)) for bin_type in batch}
+
+            retry = []
+            for bin_type, (state, error) in result.items():
+                if state == "failed":
+                    retry.append(bin_type)
+                    self._set_state([bin_type], "failed", error=error)
+                else:
+                    self._set_state([bin_type], state, sent_at=time.time(), error=error)
+            if not retry:
+                return
+            batch = retry
+            if attempt < self.max_retries:
+                delay = self.retry_delay * 2 ** attempt
+                logging.warning(f"SMS delivery failed for {batch}, retrying in {delay:.0f}s")
+                self.clock.sleep(delay)
+        logging.error(f"SMS delivery failed for {batch} after {self.max_retries + 1} attempts")
+
+    def _read_reply(self, connection, timeout, expect=("OK", "ERROR")):
+        """Read lines until one starts with an expected token; returns it, or None on timeout."""
+        deadline = self.clock.monotonic() + timeout
+        buffer = b""
+        while self.clock.monotonic() < deadline:
+            buffer += connection.read(max(1, connection.in_waiting))
+            # The AT send prompt ("> ") has no line ending.
+            if ">" in expect and buffer.lstrip().startswith(b">"):
+                return ">"
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                line = line.strip().decode(errors="replace")
+                for token in expect:
+                    if line.startswith(token) or (token == "ERROR" and "ERROR" in line):
+                        return token
+        return None
+
+    def _send_chars(self, connection, batch):
+        result = {}
+        for bin_type in batch:
+            connection.reset_input_buffer()
+            connection.write(COMMANDS[bin_type].encode())
+            reply = self._read_reply(connection, self.ack_timeout)
+            if reply == "OK":
+                result[bin_type] = ("sent", None)
+            elif reply == "ERROR":
+                result[bin_type] = ("failed", "board replied ERROR")
+            else:
+                result[bin_type] = ("unconfirmed", "no reply from board")
+        return result
+
+    def _send_at(self, connection, batch):
+        def fail(error):
+            return {bin_type: ("failed", error) for bin_type in batch}
+
+        connection.reset_input_buffer()
+        connection.write(b"AT+CMGF=1\r")
+        if self._read_reply(connection, self.ack_timeout) != "OK":
+            return fail("modem did not accept text mode")
+        connection.write(f'AT+CMGS="{self.phone_number}"\r'.encode())
+        if self._read_reply(connection, self.ack_timeout, expect=(">", "OK", "ERROR")) not in (">", "OK"):
+            return fail("modem did not prompt for the message")
+        names = ", ".join(BIN_NAMES[bin_type] for bin_type in batch)
+        connection.write(f"Polybin: {names} bin full. Please empty.".encode() + b"\x1a")
+        # Network submission can take several seconds.
+        reply = self._read_reply(connection, max(self.ack_timeout, 30))
+        if reply != "OK":
+            return fail("modem did not confirm the message" if reply is None else "modem replied ERROR")
+        return {bin_type: ("sent", None) for bin_type in batch}
+
+    def status(self):
+        with self.lock:
+            return {
+                "connected": self.serial_connection is not None and self.serial_connection.is_open,
+                "queued": self.queue.qsize(),
+                "batches": self.batches,
+                "deduplicated": self.deduplicated,
+                "deliveries": {bin_type: dict(delivery) for bin_type, delivery in self.deliveries.items()},
+            }
+
     def close(self):
-        self.serial_connection.close()
+        self._disconnect()
         print("COMM Closed!")
-        
+
 if __name__ == "__main__":
     port = 'COM6'
     bin_system = Sms(port)
@@ -34,5 +232,6 @@ if __name__ == "__main__":
         time.sleep(5)
         bin_system.send_notification('haz')
         time.sleep(5)
+        print(bin_system.status())
     finally:
-        bin_system.close()
\ No newline at end of file
+        bin_system.close()
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+DROP_POLICIES = ("oldest", "newest")
+
+
+class LogSpool:
+    """On-disk queue of log rows awaiting upload, backed by SQLite in WAL mode.
+
+    Appends are batched into one transaction and read back per table in
+    insertion order. ``max_bytes`` caps the live data in the file plus its
+    ``-wal`` file. When it is exceeded the WAL is first checkpointed back
+    into the database; if that is not enough, ``drop_policy="oldest"``
+    deletes the oldest rows of the lowest priority (highest number) to make
+    room and ``"newest"`` refuses new rows until the backlog drains. Either
+    way the drop is counted in ``dropped``.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, drop_policy="oldest"):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable across application crashes; only a power cut can lose the last commits.
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS spool ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "table_name TEXT NOT NULL, "
+            "log_type TEXT NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "created REAL NOT NULL, "
+            "priority INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(spool)")]
+        if "priority" not in columns:
+            self.connection.execute("ALTER TABLE spool ADD COLUMN priority INTEGER NOT NULL DEFAULT 1")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS spool_table ON spool (table_name, id)")
+        self.page_size = self.connection.execute("PRAGMA page_size").fetchone()[0]
+
+    def used_bytes(self):
+        with self.lock:
+            return self._used_bytes()
+
+    def _wal_bytes(self):
+        try:
+            return os.path.getsize(self.path + "-wal")
+        except OSError:
+            return 0
+
+    def _used_bytes(self):
+        pages = self.connection.execute("PRAGMA page_count").fetchone()[0]
+        free = self.connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * self.page_size + self._wal_bytes()
+
+    def _over_quota(self):
+        if self._used_bytes() <= self.max_bytes:
+            return False
+        # The WAL only shrinks when truncated; fold it into the database before dropping rows.
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return self._used_bytes() > self.max_bytes
+
+    def append(self, rows):
+        """Store ``(table_name, log_type, data, created, priority)`` rows; returns how many were kept."""
+        if not rows:
+            return 0
+        with self.lock:
+            if self.drop_policy == "newest" and self._over_quota():
+                self.dropped += len(rows)
+                return 0
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany(
+                    "INSERT INTO spool (table_name, log_type, payload, created, priority) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (table_name, log_type, json.dumps(data, default=str), created, priority)
+                        for table_name, log_type, data, created, priority in rows
+                    ],
+                )
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            if self.drop_policy == "oldest":
+                self._trim()
+            return len(rows)
+
+    def _trim(self):
+        while self._over_quota():
+            count = self.connection.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+            if not count:
+                return
+            excess = max(1, count // 10)
+            self.connection.execute(
+                "DELETE FROM spool WHERE id IN (SELECT id FROM spool ORDER BY priority DESC, id LIMIT ?)",
+                (excess,),
+            )
+            self.dropped += excess
+            logging.warning(f"Log spool over {self.max_bytes} bytes, dropped {excess} oldest low-priority rows")
+
+    def tables(self):
+        """Tables with spooled rows, mapped to (row count, creation time of the oldest row)."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT table_name, COUNT(*), MIN(created) FROM spool GROUP BY table_name"
+            ).fetchall()
+        return {table_name: (count, oldest) for table_name, count, oldest in rows}
+
+    def peek(self, table_name, limit):
+        """The oldest ``limit`` rows for a table as ``(last_id, log_type, [data, ...])``."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, log_type, payload FROM spool WHERE table_name = ? ORDER BY id LIMIT ?",
+                (table_name, limit),
+            ).fetchall()
+        if not rows:
+            return None, None, []
+        return rows[-1][0], rows[0][1], [json.loads(payload) for _, _, payload in rows]
+
+    def remove(self, table_name, last_id):
+        """Delete a table's rows up to and including ``last_id`` once they are uploaded."""
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM spool WHERE table_name = ? AND id <= ?", (table_name, last_id)
+            )
+
+    def stats(self):
+        with self.lock:
+            count = self.connection.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+            used = self._used_bytes()
+        return {"rows": count, "bytes": used, "max_bytes": self.max_bytes, "dropped": self.dropped}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,162 @@
+import importlib
+import logging
+import threading
+import time
+
+
+class SubsystemNotReady(Exception):
+    def __init__(self, name, state):
+        super().__init__(f"Subsystem {name} is {state}")
+        self.name = name
+        self.state = state
+
+
+class Subsystems:
+    """Starts named subsystems in the background and reports their readiness.
+
+    ``register(name, factory, depends)`` declares a subsystem; ``start()``
+    runs every factory on its own thread as soon as its dependencies are
+    ready, so independent subsystems initialize in parallel while the web
+    server is already answering. ``require(name)`` returns a ready
+    subsystem or raises ``SubsystemNotReady``; ``get(name, timeout)`` waits
+    for it. ``timed_import`` records how long each heavy import took and
+    ``time_block`` how long any other slow setup step took; ``report()``
+    lists import, step and init costs for the startup log and the
+    ``/startup`` endpoint. For a full per-module breakdown run the server
+    with ``python -X importtime``.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.subsystems = {}
+        self.imports = {}
+        self.steps = {}
+        self.on_settled = []
+
+    def timed_import(self, module_name):
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        with self.lock:
+            self.imports.setdefault(module_name, time.perf_counter() - start)
+        return module
+
+    def time_block(self, label, function, *args, **kwargs):
+        """Run ``function`` and record its cost under ``label``, for steps that are not imports."""
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.steps[label] = time.perf_counter() - start
+
+    def register(self, name, factory, depends=()):
+        self.subsystems[name] = {
+            "factory": factory,
+            "depends": tuple(depends),
+            "state": "pending",
+            "value": None,
+            "error": None,
+            "started": None,
+            "duration": None,
+            "ready_at": None,
+            "event": threading.Event(),
+        }
+
+    def start(self):
+        for name in self.subsystems:
+            threading.Thread(target=self._run, args=(name,), name=f"init-{name}", daemon=True).start()
+
+    def _run(self, name):
+        subsystem = self.subsystems[name]
+        for dependency in subsystem["depends"]:
+            self.subsystems[dependency]["event"].wait()
+            if self.subsystems[dependency]["state"] != "ready":
+                self._finish(name, "failed", error=f"dependency {dependency} failed")
+                return
+        subsystem["state"] = "starting"
+        subsystem["started"] = time.monotonic()
+        try:
+            value = subsystem["factory"]()
+        except Exception as e:
+            logging.error(f"Subsystem {name} failed to start: {e}", exc_info=True)
+            self._finish(name, "failed", error=str(e))
+            return
+        self._finish(name, "ready", value=value)
+
+    def _finish(self, name, state, value=None, error=None):
+        subsystem = self.subsystems[name]
+        now = time.monotonic()
+        subsystem.update(state=state, value=value, error=error, ready_at=now - self.started_at)
+        if subsystem["started"] is not None:
+            subsystem["duration"] = now - subsystem["started"]
+        logging.info(
+            f"Subsystem {name} {state} after {subsystem['ready_at']:.2f}s"
+            + (f" (init {subsystem['duration']:.2f}s)" if subsystem["duration"] is not None else "")
+        )
+        subsystem["event"].set()
+        if self.settled:
+            self._settle()
+
+    def _settle(self):
+        with self.lock:
+            callbacks, self.on_settled = self.on_settled, []
+        for callback in callbacks:
+            callback(self.report())
+
+    def when_settled(self, callback):
+        """Call ``callback(report)`` once every subsystem is ready or failed."""
+        with self.lock:
+            self.on_settled.append(callback)
+        if self.settled:
+            self._settle()
+
+    @property
+    def settled(self):
+        return all(subsystem["event"].is_set() for subsystem in self.subsystems.values())
+
+    def state(self, name):
+        return self.subsystems[name]["state"]
+
+    def require(self, name):
+        subsystem = self.subsystems[name]
+        if subsystem["state"] != "ready":
+            raise SubsystemNotReady(name, subsystem["state"])
+        return subsystem["value"]
+
+    def get(self, name, timeout=None):
+        subsystem = self.subsystems[name]
+        subsystem["event"].wait(timeout)
+        return self.require(name)
+
+    def report(self):
+        with self.lock:
+            imports = dict(self.imports)
+            steps = dict(self.steps)
+        return {
+            "uptime": time.monotonic() - self.started_at,
+            "imports": imports,
+            "steps": steps,
+            "subsystems": {
+                name: {
+                    "state": subsystem["state"],
+                    "init": subsystem["duration"],
+                    "ready_at": subsystem["ready_at"],
+                    "error": subsystem["error"],
+                }
+                for name, subsystem in self.subsystems.items()
+            },
+        }
+
+
+def format_report(report):
+    lines = ["Startup timing:"]
+    for module_name, seconds in sorted(report["imports"].items(), key=lambda item: -item[1]):
+        lines.append(f"  import {module_name:<40} {seconds * 1000:8.0f} ms")
+    for label, seconds in report["steps"].items():
+        lines.append(f"  step   {label:<40} {seconds * 1000:8.0f} ms")
+    for name, subsystem in report["subsystems"].items():
+        init = "-" if subsystem["init"] is None else f"{subsystem['init'] * 1000:.0f} ms"
+        ready_at = "-" if subsystem["ready_at"] is None else f"{subsystem['ready_at']:.2f}s"
+        lines.append(f"  init   {name:<40} {init:>11}  {subsystem['state']} at {ready_at}")
+    return "\n".join(lines)
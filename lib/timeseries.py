@@ -0,0 +1,157 @@
+import threading
+import numpy as np
+
+SENSOR_KEYS = ("SENSOR_1", "SENSOR_2", "SENSOR_3", "SENSOR_4")
+
+RESOLUTIONS = {
+    "1m": 60,
+    "1h": 3600,
+}
+
+
+class RingBuffer:
+    """Fixed-capacity ring of timestamped float32 rows."""
+
+    def __init__(self, capacity, columns=len(SENSOR_KEYS)):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((capacity, columns), dtype=np.float32)
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp, row):
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = row
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def ordered(self):
+        if self.count < self.capacity:
+            return self.timestamps[:self.count], self.values[:self.count]
+        order = np.r_[self.head:self.capacity, 0:self.head]
+        return self.timestamps[order], self.values[order]
+
+    def between(self, start, end):
+        timestamps, values = self.ordered()
+        lo = np.searchsorted(timestamps, start, side="left")
+        hi = np.searchsorted(timestamps, end, side="right")
+        return timestamps[lo:hi].copy(), values[lo:hi].copy()
+
+    @property
+    def nbytes(self):
+        return self.timestamps.nbytes + self.values.nbytes
+
+
+class BucketBuffer:
+    """Ring of fixed-width time buckets holding per-sensor min, max and mean."""
+
+    def __init__(self, bucket_seconds, capacity, columns=len(SENSOR_KEYS)):
+        self.bucket_seconds = bucket_seconds
+        # min, max and mean are stored side by side so one ring holds all three.
+        self.ring = RingBuffer(capacity, columns * 3)
+        self.columns = columns
+        self.open_start = None
+        self.open_min = np.full(columns, np.inf, dtype=np.float64)
+        self.open_max = np.full(columns, -np.inf, dtype=np.float64)
+        self.open_sum = np.zeros(columns, dtype=np.float64)
+        self.open_count = 0
+
+    def add(self, timestamp, row):
+        bucket_start = timestamp - timestamp % self.bucket_seconds
+        if self.open_start is not None and bucket_start != self.open_start:
+            if bucket_start < self.open_start:
+                return
+            self._close_bucket()
+        if self.open_start is None:
+            self.open_start = bucket_start
+        np.minimum(self.open_min, row, out=self.open_min)
+        np.maximum(self.open_max, row, out=self.open_max)
+        self.open_sum += row
+        self.open_count += 1
+
+    def _open_row(self):
+        return np.concatenate((self.open_min, self.open_max, self.open_sum / self.open_count))
+
+    def _close_bucket(self):
+        self.ring.append(self.open_start, self._open_row())
+        self.open_start = None
+        self.open_min.fill(np.inf)
+        self.open_max.fill(-np.inf)
+        self.open_sum.fill(0)
+        self.open_count = 0
+
+    def between(self, start, end):
+        start -= start % self.bucket_seconds
+        timestamps, values = self.ring.between(start, end)
+        if self.open_start is not None and self.open_count and start <= self.open_start <= end:
+            timestamps = np.append(timestamps, self.open_start)
+            values = np.vstack((values, self._open_row()[np.newaxis, :].astype(np.float32)))
+        return timestamps, values
+
+    @property
+    def nbytes(self):
+        return self.ring.nbytes
+
+
+class SensorHistory:
+    """In-memory store of bin-level readings at raw, 1 minute and 1 hour resolution.
+
+    With the default capacities this keeps about 18 h of raw samples at 1 Hz,
+    four weeks of 1 minute buckets and a year of 1 hour buckets in roughly
+    4.5 MB.
+    """
+
+    def __init__(self, raw_capacity=65536, minute_capacity=40320, hour_capacity=8760):
+        self.raw = RingBuffer(raw_capacity)
+        self.buckets = {
+            "1m": BucketBuffer(RESOLUTIONS["1m"], minute_capacity),
+            "1h": BucketBuffer(RESOLUTIONS["1h"], hour_capacity),
+        }
+        self.last_timestamp = None
+        self.lock = threading.Lock()
+
+    def append(self, timestamp, readings):
+        row = np.array([readings[key] for key in SENSOR_KEYS], dtype=np.float64)
+        with self.lock:
+            if self.last_timestamp is not None and timestamp < self.last_timestamp:
+                return
+            self.last_timestamp = timestamp
+            self.raw.append(timestamp, row)
+            for buckets in self.buckets.values():
+                buckets.add(timestamp, row)
+
+    def extend(self, samples):
+        for timestamp, readings in samples:
+            self.append(timestamp, readings)
+
+    def query(self, start, end, resolution="raw"):
+        if resolution == "raw":
+            with self.lock:
+                timestamps, values = self.raw.between(start, end)
+            return {
+                "resolution": resolution,
+                "timestamps": timestamps.tolist(),
+                **{key: values[:, i].tolist() for i, key in enumerate(SENSOR_KEYS)},
+            }
+
+        if resolution not in self.buckets:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        with self.lock:
+            timestamps, values = self.buckets[resolution].between(start, end)
+        columns = len(SENSOR_KEYS)
+        return {
+            "resolution": resolution,
+            "timestamps": timestamps.tolist(),
+            **{
+                key: {
+                    "min": values[:, i].tolist(),
+                    "max": values[:, columns + i].tolist(),
+                    "mean": values[:, 2 * columns + i].tolist(),
+                }
+                for i, key in enumerate(SENSOR_KEYS)
+            },
+        }
+
+    @property
+    def nbytes(self):
+        return self.raw.nbytes + sum(buckets.nbytes for buckets in self.buckets.values())
@@ -0,0 +1,178 @@
+import itertools
+import math
+
+
+def iou(a, b):
+    """Intersection over union of two (x1, y1, x2, y2) boxes."""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def prediction_box(prediction):
+    """Convert a Roboflow-style centre/size prediction to (x1, y1, x2, y2)."""
+    half_width = prediction["width"] / 2
+    half_height = prediction["height"] / 2
+    return (
+        prediction["x"] - half_width,
+        prediction["y"] - half_height,
+        prediction["x"] + half_width,
+        prediction["y"] + half_height,
+    )
+
+
+class Track:
+    """One object followed across frames, with its confidence-weighted class votes."""
+
+    def __init__(self, track_id, box, detection, confidence, now):
+        self.track_id = track_id
+        self.first_seen = now
+        self.votes = {}
+        self.hits = 0
+        self.retired = False
+        self.observe(box, detection, confidence, now)
+
+    def observe(self, box, detection, confidence, now):
+        self.box = box
+        self.detection = detection
+        self.confidence = confidence
+        self.votes[detection] = self.votes.get(detection, 0.0) + confidence
+        self.hits += 1
+        self.missed = 0
+        self.last_seen = now
+
+    @property
+    def center(self):
+        return ((self.box[0] + self.box[2]) / 2, (self.box[1] + self.box[3]) / 2)
+
+    @property
+    def label(self):
+        return max(self.votes, key=self.votes.get)
+
+    @property
+    def vote_share(self):
+        """Fraction of the track's confidence-weighted votes held by ``label``."""
+        total = sum(self.votes.values())
+        return self.votes[self.label] / total if total > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            "id": self.track_id,
+            "box": list(self.box),
+            "label": self.label,
+            "votes": self.votes,
+            "vote_share": self.vote_share,
+            "hits": self.hits,
+            "retired": self.retired,
+        }
+
+
+class ObjectTracker:
+    """Greedy IoU/centroid tracker that keeps stable IDs for boxes across frames.
+
+    Each frame's predictions are matched to live tracks by IoU, falling back
+    to centroid distance (in units of the track's box size) for fast-moving
+    items whose boxes no longer overlap. Tracks that go unmatched for
+    ``max_missed`` frames or ``max_age`` seconds are dropped and their IDs
+    listed in ``expired`` until the next update; retired tracks are dropped
+    on their first missed frame.
+
+    ``drop_zone`` is ``(x1, y1, x2, y2)`` as fractions of the frame; the
+    drop-zone track is the longest-lived one whose centre is inside it.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_distance=1.0, max_missed=5, max_age=2.0,
+                 drop_zone=(0.0, 0.0, 1.0, 1.0)):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.max_age = max_age
+        self.drop_zone = tuple(drop_zone)
+        self.tracks = {}
+        self.expired = []
+        self.frame_size = None
+        self._ids = itertools.count(1)
+
+    def _match_score(self, track, box):
+        overlap = iou(track.box, box)
+        if overlap >= self.iou_threshold:
+            return 1.0 + overlap
+        size = math.sqrt(max(1e-9, (track.box[2] - track.box[0]) * (track.box[3] - track.box[1])))
+        center = ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+        distance = math.dist(track.center, center) / size
+        if distance <= self.max_distance:
+            return 1.0 - distance / (self.max_distance + 1e-9)
+        return None
+
+    def update(self, predictions, frame_size, now):
+        """Match one frame's predictions; returns the tracks seen in this frame."""
+        self.frame_size = frame_size
+        self.expired = []
+        boxes = [prediction_box(prediction) for prediction in predictions]
+
+        pairs = []
+        for track in self.tracks.values():
+            for index, box in enumerate(boxes):
+                score = self._match_score(track, box)
+                if score is not None:
+                    pairs.append((score, track.track_id, index))
+        pairs.sort(reverse=True)
+
+        seen = []
+        matched_tracks, matched_boxes = set(), set()
+        for _, track_id, index in pairs:
+            if track_id in matched_tracks or index in matched_boxes:
+                continue
+            matched_tracks.add(track_id)
+            matched_boxes.add(index)
+            track = self.tracks[track_id]
+            track.observe(boxes[index], predictions[index]["class"], predictions[index]["confidence"], now)
+            seen.append(track)
+
+        for track_id, track in list(self.tracks.items()):
+            if track_id in matched_tracks:
+                continue
+            track.missed += 1
+            # A disposed item that leaves view is gone for good; dropping its track at
+            # once keeps it from absorbing the next item placed in the same spot.
+            if track.retired or track.missed > self.max_missed or now - track.last_seen > self.max_age:
+                del self.tracks[track_id]
+                self.expired.append(track_id)
+
+        for index, box in enumerate(boxes):
+            if index not in matched_boxes:
+                track = Track(next(self._ids), box, predictions[index]["class"], predictions[index]["confidence"], now)
+                self.tracks[track.track_id] = track
+                seen.append(track)
+        return seen
+
+    def in_drop_zone(self, track):
+        if self.frame_size is None:
+            return False
+        width, height = self.frame_size
+        x, y = track.center
+        x1, y1, x2, y2 = self.drop_zone
+        return x1 * width <= x <= x2 * width and y1 * height <= y <= y2 * height
+
+    def drop_zone_track(self):
+        """The live, undisposed track in the drop zone that was seen this frame, if any."""
+        candidates = [
+            track for track in self.tracks.values()
+            if track.missed == 0 and not track.retired and self.in_drop_zone(track)
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda track: (track.hits, -track.track_id))
+
+    def retire(self, track_id):
+        """Mark a track as disposed so it is never offered for confirmation again."""
+        if track_id in self.tracks:
+            self.tracks[track_id].retired = True
+
+    def reset(self):
+        self.expired = list(self.tracks)
+        self.tracks = {}
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+import cv2
+
+BOUNDARY = "frame"
+
+
+class MjpegStream:
+    """One JPEG encode per frame, shared by every ``/video_feed`` client.
+
+    The capture thread hands frames to ``publish``, which only keeps a
+    reference to the newest one. An encoder thread compresses the newest
+    frame at most ``max_fps`` times a second, and only while someone is
+    watching. Each client generator always sends the latest encoded frame
+    and never queues, so a slow client simply skips frames. With more
+    viewers the JPEG quality drops by ``quality_step`` and the frame rate by
+    ``fps_step`` per extra client, down to ``min_quality`` and ``min_fps``,
+    to bound the total upstream bandwidth.
+    """
+
+    def __init__(self, quality=80, min_quality=40, quality_step=10, max_fps=15, min_fps=5, fps_step=2,
+                 max_width=None):
+        self.quality = quality
+        self.min_quality = min_quality
+        self.quality_step = quality_step
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.fps_step = fps_step
+        self.max_width = max_width
+        self.subscribers = 0
+        self.condition = threading.Condition()
+        self.new_frame = threading.Event()
+        self.raw = None
+        self.jpeg = None
+        self.sequence = 0
+        self.frames_encoded = 0
+        self.thread = threading.Thread(target=self._encoder, daemon=True)
+        self.thread.start()
+
+    def publish(self, image):
+        """Offer a captured BGR frame; cheap enough to call from the capture loop."""
+        self.raw = image
+        self.new_frame.set()
+
+    def _targets(self):
+        extra = max(0, self.subscribers - 1)
+        quality = max(self.min_quality, self.quality - self.quality_step * extra)
+        fps = max(self.min_fps, self.max_fps - self.fps_step * extra)
+        return quality, fps
+
+    def _encoder(self):
+        next_encode = 0.0
+        while True:
+            self.new_frame.wait()
+            self.new_frame.clear()
+            if not self.subscribers:
+                continue
+            quality, fps = self._targets()
+            now = time.monotonic()
+            if now < next_encode:
+                time.sleep(next_encode - now)
+            next_encode = time.monotonic() + 1.0 / fps
+            image = self.raw
+            if image is None:
+                continue
+            try:
+                if self.max_width and image.shape[1] > self.max_width:
+                    scale = self.max_width / image.shape[1]
+                    image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            except Exception as e:
+                logging.error(f"Video feed encode failed: {e}")
+                continue
+            if not ok:
+                continue
+            with self.condition:
+                self.jpeg = encoded.tobytes()
+                self.sequence += 1
+                self.frames_encoded += 1
+                self.condition.notify_all()
+
+    def frames(self, timeout=5.0):
+        """Multipart MJPEG chunks for one client, newest frame first.
+
+        When nothing new is encoded for ``timeout`` seconds the last frame is
+        sent again (or a bare CRLF before the first one), so a client that
+        disconnected while the camera was idle is noticed on the next write.
+        """
+        with self.condition:
+            self.subscribers += 1
+            # Wait for the encode triggered below rather than replaying a stale frame.
+            last = self.sequence
+        # Encode straight away for a new viewer instead of waiting for the next capture.
+        self.new_frame.set()
+        try:
+            while True:
+                with self.condition:
+                    self.condition.wait_for(lambda: self.sequence != last, timeout=timeout)
+                    last, jpeg = self.sequence, self.jpeg
+                if jpeg is None:
+                    yield b"\r\n"
+                    continue
+                yield (
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+                    + jpeg
+                    + b"\r\n"
+                )
+        finally:
+            with self.condition:
+                self.subscribers -= 1
+
+    def stats(self):
+        quality, fps = self._targets()
+        return {
+            "subscribers": self.subscribers,
+            "frames_encoded": self.frames_encoded,
+            "quality": quality,
+            "fps": fps,
+        }
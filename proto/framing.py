@@ -0,0 +1,159 @@
+"""Self-synchronizing framing for the sensor serial link.
+
+Each frame on the wire is COBS-encoded and terminated by a single 0x00 byte,
+so a receiver that loses alignment resynchronizes at the next delimiter. The
+decoded frame body is::
+
+    version (u8) | message type (u8) | sequence (u8) | payload | crc16 (u16 LE)
+
+The CRC is CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) over everything
+before it, which is cheap to compute on the microcontroller side.
+"""
+
+import binascii
+import logging
+import struct
+
+from proto import trashscan_protocol_pb2
+
+PROTOCOL_VERSION = 1
+
+MSG_BIN_STATUS = 1
+MSG_BIN_STATUS_BATCH = 2
+
+MESSAGE_TYPES = {
+    MSG_BIN_STATUS: trashscan_protocol_pb2.BIN_STATUS,
+    MSG_BIN_STATUS_BATCH: trashscan_protocol_pb2.BIN_STATUS_BATCH,
+}
+
+FRAME_DELIMITER = b"\x00"
+HEADER = struct.Struct("<BBB")
+CRC = struct.Struct("<H")
+MAX_FRAME_SIZE = 1024
+
+
+class FrameError(ValueError):
+    pass
+
+
+def crc16(data):
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def cobs_encode(data):
+    encoded = bytearray()
+    for block in bytes(data).split(b"\x00"):
+        while len(block) >= 254:
+            encoded.append(255)
+            encoded += block[:254]
+            block = block[254:]
+        encoded.append(len(block) + 1)
+        encoded += block
+    return bytes(encoded)
+
+
+def cobs_decode(data):
+    decoded = bytearray()
+    index = 0
+    length = len(data)
+    while index < length:
+        code = data[index]
+        if code == 0:
+            raise FrameError("Unexpected zero byte in COBS data")
+        end = index + code
+        if end > length:
+            raise FrameError("Truncated COBS block")
+        decoded += data[index + 1:end]
+        index = end
+        if code != 255 and index < length:
+            decoded.append(0)
+    return bytes(decoded)
+
+
+def encode_frame(msg_type, message, sequence=0, version=PROTOCOL_VERSION):
+    payload = message if isinstance(message, (bytes, bytearray)) else message.SerializeToString()
+    body = HEADER.pack(version, msg_type, sequence & 0xFF) + payload
+    return cobs_encode(body + CRC.pack(crc16(body))) + FRAME_DELIMITER
+
+
+def decode_frame(frame):
+    body = cobs_decode(frame)
+    if len(body) < HEADER.size + CRC.size:
+        raise FrameError(f"Frame too short ({len(body)} bytes)")
+    (expected,) = CRC.unpack_from(body, len(body) - CRC.size)
+    content = body[:-CRC.size]
+    if crc16(content) != expected:
+        raise FrameError("CRC mismatch")
+    version, msg_type, sequence = HEADER.unpack_from(content)
+    if version != PROTOCOL_VERSION:
+        raise FrameError(f"Unsupported protocol version {version}")
+    message_class = MESSAGE_TYPES.get(msg_type)
+    if message_class is None:
+        raise FrameError(f"Unknown message type {msg_type}")
+    message = message_class()
+    try:
+        message.ParseFromString(content[HEADER.size:])
+    except Exception as e:
+        raise FrameError(f"Malformed {message_class.__name__} payload: {e}") from e
+    return msg_type, sequence, message
+
+
+class FrameDecoder:
+    """Incremental decoder that drops bad frames and resyncs on the next delimiter."""
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+        self.discarding = False
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+        self.sequence_gaps = 0
+        self.last_sequence = None
+
+    def feed(self, data):
+        messages = []
+        self.buffer += data
+        while True:
+            end = self.buffer.find(FRAME_DELIMITER)
+            if end < 0:
+                if len(self.buffer) > self.max_frame_size:
+                    self.buffer.clear()
+                    self.discarding = True
+                break
+            frame = bytes(self.buffer[:end])
+            del self.buffer[:end + 1]
+            if self.discarding:
+                self.discarding = False
+                self.frames_dropped += 1
+                continue
+            if not frame:
+                continue
+            try:
+                msg_type, sequence, message = decode_frame(frame)
+            except FrameError as e:
+                self.frames_dropped += 1
+                logging.debug(f"Dropping sensor frame: {e}")
+                continue
+            if self.last_sequence is not None and sequence != (self.last_sequence + 1) & 0xFF:
+                self.sequence_gaps += 1
+            self.last_sequence = sequence
+            self.frames_decoded += 1
+            messages.append((msg_type, message))
+        return messages
+
+    def stats(self):
+        return {
+            "frames_decoded": self.frames_decoded,
+            "frames_dropped": self.frames_dropped,
+            "sequence_gaps": self.sequence_gaps,
+        }
+
+
+def batch_columns(batch):
+    """Return the columns of a BIN_STATUS_BATCH as (timestamps_ms, [sensor_1..4])."""
+    return list(batch.TIMESTAMP_MS), [
+        list(batch.SENSOR_1),
+        list(batch.SENSOR_2),
+        list(batch.SENSOR_3),
+        list(batch.SENSOR_4),
+    ]
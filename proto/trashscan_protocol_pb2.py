@@ -9,7 +9,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18trashscan_protocol.proto\"T\n\nBIN_STATUS\x12\x10\n\x08SENSOR_1\x18\x01 \x01(\x02\x12\x10\n\x08SENSOR_2\x18\x02 \x01(\x02\x12\x10\n\x08SENSOR_3\x18\x03 \x01(\x02\x12\x10\n\x08SENSOR_4\x18\x04 \x01(\x02\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18trashscan_protocol.proto\"T\n\nBIN_STATUS\x12\x10\n\x08SENSOR_1\x18\x01 \x01(\x02\x12\x10\n\x08SENSOR_2\x18\x02 \x01(\x02\x12\x10\n\x08SENSOR_3\x18\x03 \x01(\x02\x12\x10\n\x08SENSOR_4\x18\x04 \x01(\x02\"p\n\x10\x42IN_STATUS_BATCH\x12\x14\n\x0cTIMESTAMP_MS\x18\x01 \x03(\r\x12\x10\n\x08SENSOR_1\x18\x02 \x03(\x02\x12\x10\n\x08SENSOR_2\x18\x03 \x03(\x02\x12\x10\n\x08SENSOR_3\x18\x04 \x03(\x02\x12\x10\n\x08SENSOR_4\x18\x05 \x03(\x02\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -18,4 +18,6 @@ if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_BIN_STATUS']._serialized_start=28
   _globals['_BIN_STATUS']._serialized_end=112
+  _globals['_BIN_STATUS_BATCH']._serialized_start=114
+  _globals['_BIN_STATUS_BATCH']._serialized_end=226
 # @@protoc_insertion_point(module_scope)
\ No newline at end of file
@@ -6,17 +6,53 @@ import time
 import argparse
 import logging
 from collections import deque
-from alerts.alert import Alert
-import cv2
-from flask import Flask, jsonify
+from lib.startup import Subsystems, SubsystemNotReady, format_report
+
+# Only the web stack is imported up front; hardware, Supabase, pygame and the
+# model load in background subsystems once the server is already listening.
+subsystems = Subsystems()
+for module_name in ("flask", "flask_cors", "flask_socketio", "config", "lib.broadcast", "lib.confirmation",
+                    "lib.tracker"):
+    subsystems.timed_import(module_name)
+
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
-from lib.polybin import Polybin
-from lib.dispose import Dispose
-from lib.async_logger import AsyncLogger
-from inference_sdk import InferenceHTTPClient
-from inference import InferencePipeline
-from inference.core.interfaces.stream.sinks import render_boxes
+from lib.broadcast import SensorBroadcaster
+from lib.confirmation import DecisionStats, SequentialConfirmation
+from lib.tracker import ObjectTracker
+from config import (
+    SERIAL_PORT,
+    SERIAL_BAUD_RATE,
+    SMS_PROTOCOL,
+    SMS_PHONE_NUMBER,
+    SMS_BATCH_WINDOW,
+    SENSOR_SERIAL_PORT,
+    SENSOR_BAUD_RATE,
+    SENSOR_PROTOCOL,
+    SENSOR_THRESHOLD,
+    SENSOR_MEDIAN_WINDOW,
+    SENSOR_PROCESS_VARIANCE,
+    SENSOR_MEASUREMENT_VARIANCE,
+    BROADCAST_EPSILON,
+    BROADCAST_INTERVAL,
+    LOG_BATCH_SIZE,
+    LOG_FLUSH_INTERVAL,
+    LOG_SPOOL_PATH,
+    LOG_SPOOL_MAX_MB,
+    LOG_SPOOL_DROP_POLICY,
+    LOG_PREDICTION_RATE,
+    LOG_BIN_LEVEL_EPSILON,
+    LOG_BIN_LEVEL_HEARTBEAT,
+    DATASET_JPEG_QUALITY,
+    DATASET_UPLOAD_WORKERS,
+    DATASET_UPLOAD_QUEUE,
+    DATASET_HASH_DISTANCE,
+    DATASET_HASH_INDEX_SIZE,
+    DATASET_PREFER_UNCERTAIN,
+    VIDEO_QUALITY,
+    VIDEO_MAX_FPS,
+)
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -30,11 +66,94 @@ key: str = os.getenv("SUPABASE_KEY")
 app = Flask(__name__)
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
+broadcaster = SensorBroadcaster(
+    socketio, epsilon=BROADCAST_EPSILON, interval=BROADCAST_INTERVAL
+)
+
+
+def init_logger():
+    async_logger = subsystems.timed_import("lib.async_logger")
+    log_policy = subsystems.timed_import("lib.log_policy")
+    return async_logger.AsyncLogger(
+        url,
+        key,
+        batch_size=LOG_BATCH_SIZE,
+        flush_interval=LOG_FLUSH_INTERVAL,
+        spool_path=LOG_SPOOL_PATH,
+        spool_max_bytes=LOG_SPOOL_MAX_MB * 1024 * 1024,
+        drop_policy=LOG_SPOOL_DROP_POLICY,
+        policies=log_policy.default_policies(
+            prediction_rate=LOG_PREDICTION_RATE,
+            bin_level_epsilon=LOG_BIN_LEVEL_EPSILON,
+            bin_level_heartbeat=LOG_BIN_LEVEL_HEARTBEAT,
+        ),
+        jpeg_quality=DATASET_JPEG_QUALITY,
+        upload_workers=DATASET_UPLOAD_WORKERS,
+        upload_queue=DATASET_UPLOAD_QUEUE,
+    )
+
+
+def init_dataset_capture():
+    return subsystems.timed_import("lib.dataset").DatasetCapture(
+        subsystems.require("logger"),
+        max_distance=DATASET_HASH_DISTANCE,
+        index_size=DATASET_HASH_INDEX_SIZE,
+        prefer_uncertain=DATASET_PREFER_UNCERTAIN,
+    )
+
+
+def init_dispose():
+    return subsystems.timed_import("lib.dispose").Dispose(35, 32)
+
+
+def init_alert():
+    alert_module = subsystems.timed_import("alerts.alert")
+    # Opening the audio device and decoding the clips is the slow part, not the import.
+    return subsystems.time_block("pygame mixer and alert clips", alert_module.Alert)
+
+
+def init_sms():
+    return subsystems.timed_import("lib.sms").Sms(
+        SERIAL_PORT,
+        SERIAL_BAUD_RATE,
+        protocol=SMS_PROTOCOL,
+        phone_number=SMS_PHONE_NUMBER or None,
+        batch_window=SMS_BATCH_WINDOW,
+    )
+
+
+def init_video():
+    return subsystems.timed_import("lib.video").MjpegStream(
+        quality=VIDEO_QUALITY, max_fps=VIDEO_MAX_FPS
+    )
 
-logger = AsyncLogger(url, key)
-dispose = Dispose(35, 32)
-alert = Alert()
-polybin = Polybin("/dev/ttyUSB0", socketio, logger)
+
+def publish_video_frame(video_frame):
+    """Hand a captured frame to the shared /video_feed encoder, if it is up."""
+    if subsystems.state("video") == "ready":
+        subsystems.require("video").publish(video_frame.image)
+
+
+def init_polybin():
+    polybin_module = subsystems.timed_import("lib.polybin")
+    filters = subsystems.timed_import("lib.filters")
+    return polybin_module.Polybin(
+        SERIAL_PORT,
+        socketio,
+        subsystems.require("logger"),
+        sensor_port=SENSOR_SERIAL_PORT,
+        sensor_baud_rate=SENSOR_BAUD_RATE,
+        sensor_protocol=SENSOR_PROTOCOL,
+        signal_filter=filters.SensorFilter(
+            median_window=SENSOR_MEDIAN_WINDOW,
+            process_variance=SENSOR_PROCESS_VARIANCE,
+            measurement_variance=SENSOR_MEASUREMENT_VARIANCE,
+        ),
+        broadcaster=broadcaster,
+        alert=subsystems.require("alert"),
+        sms=subsystems.require("sms"),
+        full_threshold=SENSOR_THRESHOLD,
+    )
 
 
 def parse_arguments():
@@ -55,6 +174,62 @@ def parse_arguments():
         default=0.7,
         help="Confidence threshold for inference",
     )
+    parser.add_argument(
+        "--backend",
+        choices=["roboflow", "onnx"],
+        default="roboflow",
+        help="Detector backend: hosted Roboflow model or local ONNX Runtime (default is roboflow)",
+    )
+    parser.add_argument(
+        "--onnx_model",
+        type=str,
+        default="models/garbage-segregator.onnx",
+        help="Path to the exported ONNX model for the onnx backend",
+    )
+    parser.add_argument(
+        "--classes",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Class names in model index order, if the ONNX model has no names metadata",
+    )
+    parser.add_argument(
+        "--disable_motion_gate",
+        action="store_true",
+        help="Run the model on every frame instead of only when the chute changes",
+    )
+    parser.add_argument(
+        "--motion_threshold",
+        type=int,
+        default=25,
+        help="Grey-level change that counts as motion (default is 25)",
+    )
+    parser.add_argument(
+        "--motion_refresh",
+        type=float,
+        default=10.0,
+        help="Seconds between forced inferences while nothing moves (default is 10)",
+    )
+    parser.add_argument(
+        "--confirmation",
+        choices=["window", "sequential"],
+        default="window",
+        help="Confirm on a fixed 2 s window or on confidence-weighted evidence (default is window)",
+    )
+    parser.add_argument(
+        "--error_rate",
+        type=float,
+        default=0.01,
+        help="Target probability of confirming the wrong class in sequential mode (default is 0.01)",
+    )
+    parser.add_argument(
+        "--drop_zone",
+        type=float,
+        nargs=4,
+        default=[0.0, 0.0, 1.0, 1.0],
+        metavar=("X1", "Y1", "X2", "Y2"),
+        help="Region of the frame, as fractions, where a tracked item is confirmed (default is the whole frame)",
+    )
     return parser.parse_args()
 
 
@@ -63,24 +238,97 @@ model_id = f"garbage-segregator-ndyo4/{args.version}"
 
 
 class DetectionState:
-    def __init__(self, confirmation_time=2):
-        self.reset()
-        self.confirmation_time = confirmation_time
+    """Decides when the object in the chute has been seen consistently enough to dispose.
+
+    ``mode="window"`` is the original rule: the same class for
+    ``confirmation_time`` seconds with an 80% match over the last 10 frames.
+    ``mode="sequential"`` weighs each frame by its confidence (see
+    ``lib.confirmation.SequentialConfirmation``) and confirms as soon as the
+    chance of a wrong decision is below ``error_rate``.
+
+    When updates carry a ``track_id`` (see ``lib.tracker.ObjectTracker``),
+    evidence is kept per tracked object, so switching between several items
+    in view does not restart confirmation for any of them.
+    """
+
+    def __init__(self, confirmation_time=2, mode="window", error_rate=0.01, num_classes=4):
+        if mode not in ("window", "sequential"):
+            raise ValueError(f"Unknown confirmation mode: {mode}")
         self.lock = threading.Lock()
-        logging.info(
-            f"DetectionState initialized with confirmation time of {confirmation_time} seconds"
-        )
+        self.mode = mode
+        self.confirmation_time = confirmation_time
+        self.error_rate = error_rate
+        self.num_classes = num_classes
+        self.decision_stats = DecisionStats()
+        self.reset()
+        if mode == "sequential":
+            logging.info(
+                f"DetectionState initialized in sequential mode with error rate {error_rate}"
+            )
+        else:
+            logging.info(
+                f"DetectionState initialized with confirmation time of {confirmation_time} seconds"
+            )
 
     def reset(self):
-        self.current_detection = None
-        self.detection_start_time = 0
-        self.recent_detections = deque(maxlen=10)
+        with self.lock:
+            self.current_detection = None
+            self.current_track = None
+            self.detection_start_time = 0
+            self.episode_start_time = None
+            self.decided = False
+            self.recent_detections = deque(maxlen=10)
+            self.evidence = {}
+            self.decided_tracks = set()
         logging.info("Detection state reset")
 
-    def update(self, detection):
+    def forget(self, track_id):
+        """Drop the evidence for one track, e.g. once it has been disposed or left the frame."""
+        with self.lock:
+            self.evidence.pop(track_id, None)
+            self.decided_tracks.discard(track_id)
+            if track_id == self.current_track:
+                self.current_detection = None
+                self.current_track = None
+                self.episode_start_time = None
+                self.decided = False
+                self.recent_detections.clear()
+
+    def update(self, detection, confidence=None, track_id=None):
         with self.lock:
             current_time = time.time()
 
+            if self.mode == "sequential":
+                evidence = self.evidence.get(track_id)
+                if evidence is None:
+                    evidence = SequentialConfirmation(
+                        num_classes=self.num_classes, error_rate=self.error_rate
+                    )
+                    self.evidence[track_id] = evidence
+                evidence.update(detection, confidence, current_time)
+                if evidence.observations == 1:
+                    # First frame of a new object, or the accumulator restarted after a gap.
+                    self.decided_tracks.discard(track_id)
+                self.current_track = track_id
+                self.episode_start_time = evidence.started_at
+                self.decided = track_id in self.decided_tracks
+                self.current_detection = evidence.leader
+                logging.debug(
+                    f"Sequential evidence for {self.current_detection} (track {track_id}): "
+                    f"{evidence.scores[self.current_detection]:.2f}/{evidence.threshold:.2f}"
+                )
+                return
+
+            if track_id != self.current_track:
+                # A different object is in the drop zone; its window starts now.
+                self.current_track = track_id
+                self.current_detection = None
+                self.episode_start_time = None
+                self.decided = False
+
+            if self.episode_start_time is None:
+                self.episode_start_time = current_time
+
             if detection != self.current_detection:
                 logging.info(
                     f"New detection: {detection}. Previous: {self.current_detection}"
@@ -98,6 +346,10 @@ class DetectionState:
 
     def is_detection_confirmed(self):
         with self.lock:
+            if self.mode == "sequential":
+                evidence = self.evidence.get(self.current_track)
+                return evidence is not None and evidence.decision is not None
+
             if not self.current_detection:
                 logging.debug("No current detection to confirm")
                 return False
@@ -139,11 +391,59 @@ class DetectionState:
 
     def get_confirmed_detection(self):
         result = self.current_detection if self.is_detection_confirmed() else None
+        if result is not None:
+            with self.lock:
+                if not self.decided and self.episode_start_time is not None:
+                    self.decided = True
+                    self.decided_tracks.add(self.current_track)
+                    latency = time.time() - self.episode_start_time
+                    self.decision_stats.record(latency)
+                    logging.info(f"Decision latency for {result}: {latency:.2f}s")
         logging.debug(f"get_confirmed_detection called. Result: {result}")
         return result
 
+    def stats(self):
+        with self.lock:
+            pending = None
+            if self.episode_start_time is not None and not self.decided:
+                pending = time.time() - self.episode_start_time
+            return {
+                "mode": self.mode,
+                "current": self.current_detection,
+                "track": self.current_track,
+                "pending_for": pending,
+                "latency": self.decision_stats.summary(),
+            }
+
+
+detection_state = DetectionState(
+    confirmation_time=2, mode=args.confirmation, error_rate=args.error_rate
+)
+tracker = ObjectTracker(drop_zone=args.drop_zone)
+
+
+def on_dispose_complete(event):
+    """Record a finished disposal and tell connected clients about it."""
+    if event["ok"]:
+        subsystems.require("logger").log_dispose({"bin_type": event["status"]})
+        logging.info(f"Action performed: {event['status']}")
+    socketio.emit("dispose_complete", event)
+
+
+def on_item_dropped(event):
+    """Note that the chute is clear; other tracked items keep the evidence they have."""
+    logging.info(f"Item dropped: {event['detection']}")
+
+
+def init_actuator():
+    dispose = subsystems.require("dispose")
+    return subsystems.timed_import("lib.actuator").ActuationWorker(
+        dispose,
+        on_complete=on_dispose_complete,
+        on_dropped=on_item_dropped,
+        cooldown=dispose.COOLDOWN_PERIOD,
+    )
 
-detection_state = DetectionState(confirmation_time=2)
 
 def get_second_monitor_position():
     try:
@@ -162,14 +462,19 @@ def get_second_monitor_position():
     return 0, 0
 
 
-second_monitor_position = get_second_monitor_position()
+second_monitor_position = None
 
-def save_image_async(image_data, filename, logger):
-    thread = threading.Thread(target=logger.log_dataset, args=(image_data, filename))
-    thread.start()
 
 def display_full_screen(frame_data):
+    global second_monitor_position
+    import cv2
+
     try:
+        if second_monitor_position is None:
+            # Runs xrandr on the first rendered frame; shows up in the startup report.
+            second_monitor_position = subsystems.time_block(
+                "display monitor probe", get_second_monitor_position
+            )
         cv2.namedWindow("FullScreen", cv2.WND_PROP_FULLSCREEN)
         cv2.setWindowProperty("FullScreen", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
         cv2.moveWindow("FullScreen", second_monitor_position[0], second_monitor_position[1])
@@ -181,7 +486,19 @@ def display_full_screen(frame_data):
 
 def on_prediction(predictions, video_frame, render_boxes_enabled):
     try:
+        polybin = subsystems.require("polybin")
+        logger = subsystems.require("logger")
+        actuator = subsystems.require("actuator")
+        alert = subsystems.require("alert")
+        dataset_capture = subsystems.require("dataset_capture")
+
+        if args.backend == "roboflow" and args.disable_motion_gate:
+            # InferencePipeline owns the camera here, so frames reach the feed from this callback.
+            publish_video_frame(video_frame)
+
         if render_boxes_enabled:
+            from inference.core.interfaces.stream.sinks import render_boxes
+
             def on_frame_rendered(frame_data):
                 display_full_screen(frame_data)
             
@@ -196,90 +513,121 @@ def on_prediction(predictions, video_frame, render_boxes_enabled):
         logging.info(f"Thresholds: {thresholds}")
         
         if "image" in predictions and "predictions" in predictions:
+            # Update on empty frames too so tracks that left the view expire.
+            image = predictions["image"]
+            tracker.update(
+                predictions["predictions"], (image["width"], image["height"]), time.time()
+            )
+            for track_id in tracker.expired:
+                detection_state.forget(track_id)
+
             if predictions["predictions"]:
                 for prediction in predictions["predictions"]:
                     logger.log_prediction(prediction)
 
-                object_class = predictions["predictions"][0]["class"]
-                confidence = predictions["predictions"][0]["confidence"]
+                track = tracker.drop_zone_track()
+                if track is None:
+                    logging.debug("No tracked object in the drop zone")
+                    return
+                object_class = track.detection
+                confidence = track.confidence
 
                 logging.debug(
-                    f"Raw prediction: {object_class} (confidence: {confidence:.2f})"
+                    f"Drop-zone track {track.track_id}: {object_class} (confidence: {confidence:.2f}), "
+                    f"votes lead {track.label} ({track.vote_share:.0%})"
                 )
 
-                detection_state.update(object_class)
+                if detection_state.mode == "sequential":
+                    # The sequential test already weighs every frame's class and confidence per track.
+                    detection_state.update(object_class, confidence, track.track_id)
+                else:
+                    # A single misread frame must not restart the window, so it follows the vote leader.
+                    detection_state.update(track.label, track.vote_share, track.track_id)
                 confirmed_detection = detection_state.get_confirmed_detection()
                 if confirmed_detection:
                     logging.info(f"Confirmed detection: {confirmed_detection} (confidence: {confidence:.2f})")
                     
-                    logger.log_dataset(video_frame)
+                    dataset_capture.offer(video_frame, confidence)
 
-                    if dispose.can_perform_action():
-                        status = None
+                    if actuator.chute_clear:
                         sensor_map = {
-                            "Bio-degradable": "SENSOR_1",
-                            "Non-biodegradable": "SENSOR_2",
-                            "Recyclable": "SENSOR_3",
-                            "Hazardous": "SENSOR_4"
+                            "Bio-degradable": ("SENSOR_1", "bio"),
+                            "Non-biodegradable": ("SENSOR_2", "non"),
+                            "Recyclable": ("SENSOR_3", "rec"),
+                            "Hazardous": ("SENSOR_4", "haz"),
                         }
 
                         if confirmed_detection in sensor_map:
-                            sensor_key = sensor_map[confirmed_detection]
+                            sensor_key, alert_type = sensor_map[confirmed_detection]
                             if thresholds[sensor_key]:
-                                if confirmed_detection == "Bio-degradable":
-                                    dispose.dispose_biodegradable()
-                                    status = "Biodegradable"
-                                elif confirmed_detection == "Non-biodegradable":
-                                    dispose.dispose_non_biodegradable()
-                                    status = "Non-Biodegradable"
-                                elif confirmed_detection == "Recyclable":
-                                    dispose.dispose_recyclable()
-                                    status = "Recyclable"
-                                elif confirmed_detection == "Hazardous":
-                                    dispose.dispose_hazardous()
-                                    status = "Hazardous"
+                                if actuator.submit(confirmed_detection):
+                                    tracker.retire(track.track_id)
+                                    detection_state.forget(track.track_id)
+                                    logging.info(f"Disposal queued: {confirmed_detection} (track {track.track_id})")
                             else:
-                                if confirmed_detection == "Bio-degradable":
-                                    logging.warning("Action prevented: Bio-degradable bin full. Please empty the bin.")
-                                    alert.play_remove("bio")
-                                elif confirmed_detection == "Non-biodegradable":
-                                    logging.warning("Action prevented: Non-biodegradable bin full. Please empty the bin.")
-                                    alert.play_remove("non")
-                                elif confirmed_detection == "Recyclable":
-                                    logging.warning("Action prevented: Recyclable bin full. Please empty the bin.")
-                                    alert.play_remove("rec")
-                                elif confirmed_detection == "Hazardous":
-                                    logging.warning("Action prevented: Hazardous bin full. Please empty the bin.")
-                                    alert.play_remove("haz")
-
-                        if status:
-                            detection_state.reset()
-                            logger.log_dispose({"bin_type": status})
-                            logging.info(f"Action performed: {status}")
-                            logging.info("Detection state completely reset after disposal")
+                                logging.warning(f"Action prevented: {confirmed_detection} bin full. Please empty the bin.")
+                                alert.play_remove(alert_type)
                     else:
-                        logging.warning("Action prevented: Dispose cooldown in effect")
+                        logging.warning("Action prevented: Previous item still in the chute")
                 else:
                     logging.debug(f"Detection not yet confirmed: {object_class}")
             else:
                 logging.debug("No detection in this frame")
         else:
             logging.error("Invalid results format in predictions")
+    except SubsystemNotReady as e:
+        logging.warning(f"Skipping prediction: {e}")
     except Exception as e:
         logging.error(f"Error in on_prediction: {e}", exc_info=True)
 
 
-def start_pipeline():
-    """Start the inference pipeline."""
-    try:
-        pipeline = InferencePipeline.init(
-            model_id=model_id,
-            video_reference=0,
+def init_pipeline():
+    """Load the model and build the inference pipeline without starting it."""
+    if args.render_boxes:
+        subsystems.timed_import("inference.core.interfaces.stream.sinks")
+    if args.backend == "onnx" or not args.disable_motion_gate:
+        detector_module = subsystems.timed_import("lib.detector")
+        if args.backend == "onnx":
+            detector = detector_module.OnnxDetector(
+                args.onnx_model, class_names=args.classes, confidence=args.confidence
+            )
+        else:
+            detector = detector_module.RoboflowDetector(model_id, confidence=args.confidence)
+        frame_gate = None
+        if not args.disable_motion_gate:
+            frame_gate = subsystems.timed_import("lib.motion").MotionGate(
+                threshold=args.motion_threshold, refresh_interval=args.motion_refresh
+            )
+        return detector_module.DetectionPipeline(
+            detector,
             on_prediction=lambda predictions, video_frame: on_prediction(
                 predictions, video_frame, args.render_boxes
             ),
-            confidence=args.confidence,
+            video_reference=0,
+            frame_gate=frame_gate,
+            on_frame_skipped=(
+                (lambda video_frame: display_full_screen((None, video_frame.image)))
+                if args.render_boxes
+                else None
+            ),
+            on_frame=publish_video_frame,
         )
+    return subsystems.timed_import("inference").InferencePipeline.init(
+        model_id=model_id,
+        video_reference=0,
+        on_prediction=lambda predictions, video_frame: on_prediction(
+            predictions, video_frame, args.render_boxes
+        ),
+        confidence=args.confidence,
+    )
+
+
+def start_pipeline():
+    """Start the inference pipeline once it and everything it drives are ready."""
+    try:
+        pipeline = subsystems.get("pipeline")
+        for name in ("polybin", "actuator", "alert", "dataset_capture"):
+            subsystems.get(name)
         pipeline.start()
         pipeline.join()
     except Exception as e:
@@ -289,33 +637,209 @@ def start_pipeline():
 def sensor_data_updater():
     """Continuously update sensor data."""
     try:
+        polybin = subsystems.get("polybin")
         while True:
             polybin.update_sensor_data()
     except Exception as e:
         logging.error(f"Error in sensor_data_updater: {e}")
 
 
+subsystems.register("logger", init_logger)
+subsystems.register("dataset_capture", init_dataset_capture, depends=("logger",))
+subsystems.register("dispose", init_dispose)
+subsystems.register("actuator", init_actuator, depends=("dispose",))
+subsystems.register("alert", init_alert)
+subsystems.register("sms", init_sms)
+subsystems.register("polybin", init_polybin, depends=("logger", "alert", "sms"))
+subsystems.register("pipeline", init_pipeline)
+subsystems.register("video", init_video)
+
+
+@app.errorhandler(SubsystemNotReady)
+def handle_not_ready(error):
+    """Answer 503 while the subsystem behind an endpoint is still starting."""
+    return jsonify({"error": str(error), "subsystem": error.name, "state": error.state}), 503
+
+
+@app.route("/startup", methods=["GET"])
+def get_startup_report():
+    """Get per-subsystem readiness and the import and init timings."""
+    return jsonify(subsystems.report())
+
+
 @app.route("/sensor_data", methods=["GET"])
 def get_sensor_data():
-    """Get the latest sensor data."""
+    """Get the latest sensor data, answering 304 when the client's ETag is current."""
+    polybin = subsystems.require("polybin")
     try:
-        return jsonify(polybin.latest_data)
+        _, etag, body, _ = polybin.snapshot.state
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     except Exception as e:
         logging.error(f"Error in get_sensor_data: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/sensor_data/stream", methods=["GET"])
+def stream_sensor_data():
+    """Push sensor data to the client as Server-Sent Events."""
+    polybin = subsystems.require("polybin")
+
+    def generate():
+        version, _, body, _ = polybin.snapshot.state
+        yield f"id: {version}\nevent: sensor_update\ndata: {body.decode()}\n\n"
+        while True:
+            state = polybin.snapshot.wait_for_change(version, timeout=15)
+            if state[0] == version:
+                yield ": keep-alive\n\n"
+                continue
+            version, _, body, _ = state
+            yield f"id: {version}\nevent: sensor_update\ndata: {body.decode()}\n\n"
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/video_feed", methods=["GET"])
+def video_feed():
+    """Stream the chute camera as MJPEG; every client shares one encoder."""
+    video = subsystems.require("video")
+    return Response(
+        video.frames(),
+        mimetype="multipart/x-mixed-replace; boundary=frame",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.route("/video_feed/status", methods=["GET"])
+def get_video_feed_status():
+    """Get the number of viewers and the current stream quality and frame rate."""
+    return jsonify(subsystems.require("video").stats())
+
+
+@app.route("/detection/stats", methods=["GET"])
+def get_detection_stats():
+    """Get the confirmation mode and time-to-decision statistics."""
+    return jsonify(detection_state.stats())
+
+
+@app.route("/detection/tracks", methods=["GET"])
+def get_tracks():
+    """Get the objects currently tracked in the chute camera."""
+    return jsonify([track.to_dict() for track in list(tracker.tracks.values())])
+
+
+@app.route("/logger/status", methods=["GET"])
+def get_logger_status():
+    """Get the log writer's queue depth and delivery counters."""
+    return jsonify(subsystems.require("logger").stats())
+
+
+@app.route("/dataset/status", methods=["GET"])
+def get_dataset_status():
+    """Get how many confirmed frames were captured or skipped as near-duplicates."""
+    return jsonify(subsystems.require("dataset_capture").stats())
+
+
+@app.route("/alerts/status", methods=["GET"])
+def get_alert_status():
+    """Get the alert queue depth and its merge and drop counters."""
+    return jsonify(subsystems.require("alert").stats())
+
+
+@app.route("/sms/status", methods=["GET"])
+def get_sms_status():
+    """Get the SMS link's connection state and per-bin delivery status."""
+    return jsonify(subsystems.require("sms").status())
+
+
+@app.route("/actuator/status", methods=["GET"])
+def get_actuator_status():
+    """Get the disposal worker's current status and counters."""
+    return jsonify(subsystems.require("actuator").status())
+
+
+@app.route("/sensor_data/raw", methods=["GET"])
+def get_raw_sensor_data():
+    """Get the latest unfiltered sensor data."""
+    polybin = subsystems.require("polybin")
+    try:
+        return jsonify(polybin.latest_raw)
+    except Exception as e:
+        logging.error(f"Error in get_raw_sensor_data: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sensor_data/history", methods=["GET"])
+def get_sensor_history():
+    """Get bin-level history from the in-memory store.
+
+    Query parameters: ``from`` and ``to`` as Unix timestamps (default: the
+    last hour) and ``resolution`` as ``raw``, ``1m`` or ``1h``.
+    """
+    polybin = subsystems.require("polybin")
+    try:
+        end = request.args.get("to", default=time.time(), type=float)
+        start = request.args.get("from", default=end - 3600, type=float)
+        resolution = request.args.get("resolution", default="raw")
+        return jsonify(polybin.history.query(start, end, resolution))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error in get_sensor_history: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @socketio.on("connect")
 def handle_connect():
     """Handle client connections."""
     try:
-        emit("sensor_update", polybin.latest_data)
+        broadcaster.subscribe(request.sid)
+        if subsystems.state("polybin") == "ready":
+            emit("sensor_update", subsystems.require("polybin").latest_data)
     except Exception as e:
         logging.error(f"Error in handle_connect: {e}")
 
 
+@socketio.on("subscribe")
+def handle_subscribe(data):
+    """Limit a client's sensor updates to specific bins and/or binary frames.
+
+    Expects ``{"bins": ["SENSOR_1", ...], "binary": false}``; both keys are optional.
+    """
+    try:
+        data = data or {}
+        binary = bool(data.get("binary", False))
+        bins = broadcaster.subscribe(request.sid, data.get("bins"), binary)
+        if subsystems.state("polybin") == "ready":
+            event = "sensor_update_binary" if binary else "sensor_update"
+            latest_data = subsystems.require("polybin").latest_data
+            emit(event, broadcaster.snapshot(latest_data, bins, binary))
+    except ValueError as e:
+        emit("subscribe_error", {"error": str(e)})
+    except Exception as e:
+        logging.error(f"Error in handle_subscribe: {e}")
+
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    """Drop a disconnected client's subscription."""
+    broadcaster.unsubscribe(request.sid)
+
+
 if __name__ == "__main__":
     try:
+        subsystems.when_settled(lambda report: logging.info(format_report(report)))
+        subsystems.start()
+
         detection_thread = threading.Thread(target=start_pipeline)
         detection_thread.daemon = True
         detection_thread.start()
@@ -324,8 +848,14 @@ if __name__ == "__main__":
         updater_thread.daemon = True
         updater_thread.start()
 
+        # The reloader would re-import this module in a child process and start everything twice.
         socketio.run(
-            app, debug=True, host="0.0.0.0", port=5000, allow_unsafe_werkzeug=True
+            app,
+            debug=True,
+            use_reloader=False,
+            host="0.0.0.0",
+            port=5000,
+            allow_unsafe_werkzeug=True,
         )
     except Exception as e:
         logging.error(f"Error in main: {e}")